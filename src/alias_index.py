@@ -0,0 +1,150 @@
+"""Persistent index of the functions named by the 'Alias:' section of their docstrings
+
+The index is written to a compact binary file which is memory mapped for lookups, so opening it neither parses
+docstrings nor loads the whole file. Layout (little endian):
+
+    header  magic b"DSAI", format version, slot count (power of 2), alias count       4s I I I
+    slots   open addressing hash table, empty slots have length 0                      slot count * (Q I I)
+            64 bit hash of the alias, offset and length of its entry in the pool
+    pool    utf-8 entries "alias\\0module\\0qualname\\0lineno[\\0module\\0qualname\\0lineno...]"
+
+Incremental updates re-parse changed files through a 'DocstringIndex' and rewrite the (small) alias file.
+"""
+import hashlib
+import mmap
+import os
+import struct
+from typing import Iterable, NamedTuple, Optional
+
+from src.docstring_index import DocstringIndex, UpdateStats
+from src.docstring_scanner import DocstringRecord
+from src.lark_docstring_parser import normalize_alias
+
+MAGIC = b"DSAI"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIII")
+SLOT = struct.Struct("<QII")
+
+
+class AliasEntry(NamedTuple):
+    module: str
+    qualname: str
+    lineno: int
+
+
+def alias_hash(alias: str) -> int:
+    return int.from_bytes(hashlib.blake2b(alias.encode(), digest_size=8).digest(), "little")
+
+
+def collect_aliases(records: Iterable[DocstringRecord]) -> dict[str, list[AliasEntry]]:
+    """maps the normalized aliases of the records to their functions"""
+    aliases: dict[str, list[AliasEntry]] = {}
+    for record in records:
+        if record.docstring is not None and record.docstring.alias:
+            entry = AliasEntry(record.module, record.qualname, record.lineno)
+            aliases.setdefault(record.docstring.alias, []).append(entry)
+    return aliases
+
+
+def duplicates(aliases: dict[str, list[AliasEntry]]) -> dict[str, list[AliasEntry]]:
+    """aliases used by more than one function"""
+    return {alias: entries for alias, entries in aliases.items() if len(entries) > 1}
+
+
+def write_alias_file(aliases: dict[str, list[AliasEntry]], path: str):
+    """writes the index atomically, readers of the old file are not disturbed"""
+    slot_count = 8
+    while slot_count < 2 * len(aliases):  # load factor <= 0.5
+        slot_count *= 2
+    slots = [(0, 0, 0)] * slot_count
+    pool = bytearray()
+    pool_start = HEADER.size + slot_count * SLOT.size
+    for alias in sorted(aliases):
+        fields = [alias]
+        for entry in aliases[alias]:
+            fields += [entry.module, entry.qualname, str(entry.lineno)]
+        blob = "\0".join(fields).encode()
+        hash_ = alias_hash(alias)
+        index = hash_ & (slot_count - 1)
+        while slots[index][2]:
+            index = (index + 1) & (slot_count - 1)
+        slots[index] = (hash_, pool_start + len(pool), len(blob))
+        pool += blob
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, slot_count, len(aliases)))
+        for slot in slots:
+            file.write(SLOT.pack(*slot))
+        file.write(pool)
+    os.replace(temporary, path)
+
+
+class AliasIndex:
+    """memory mapped alias index, lookups are O(1) and normalize the alias like 'Docstring' does"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size or HEADER.unpack_from(self._map)[:2] != (MAGIC, FORMAT_VERSION):
+            self.close()
+            raise ValueError(f"'{path}' is no alias index of format version {FORMAT_VERSION}")
+        _, _, self.slot_count, self.alias_count = HEADER.unpack_from(self._map)
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self) -> "AliasIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.alias_count
+
+    def lookup(self, alias: str) -> list[AliasEntry]:
+        """functions with the alias, more than one if the alias is ambiguous"""
+        alias = normalize_alias(alias)
+        hash_ = alias_hash(alias)
+        index = hash_ & (self.slot_count - 1)
+        while True:
+            slot_hash, offset, length = SLOT.unpack_from(self._map, HEADER.size + index * SLOT.size)
+            if length == 0:
+                return []
+            if slot_hash == hash_:
+                fields = self._map[offset : offset + length].decode().split("\0")
+                if fields[0] == alias:
+                    return [
+                        AliasEntry(module, qualname, int(lineno))
+                        for module, qualname, lineno in zip(fields[1::3], fields[2::3], fields[3::3])
+                    ]
+            index = (index + 1) & (self.slot_count - 1)
+
+    def get(self, alias: str) -> Optional[AliasEntry]:
+        """the function with the alias, None if the alias is unknown or ambiguous"""
+        entries = self.lookup(alias)
+        return entries[0] if len(entries) == 1 else None
+
+
+def update_alias_index(
+    root: str,
+    alias_path: str,
+    index_path: Optional[str] = None,
+    workers: int = 1,
+) -> tuple[UpdateStats, dict[str, list[AliasEntry]]]:
+    """re-parses the changed files below root and rewrites the alias index
+
+    Args:
+        root: source tree
+        alias_path: alias index file
+        index_path: docstring index keeping the parse results between runs, defaults to alias_path + ".db"
+        workers: number of worker processes to parse changed files
+
+    Returns:
+        update statistics of the docstring index and the duplicate aliases
+    """
+    with DocstringIndex(index_path or alias_path + ".db") as index:
+        stats = index.update(root, workers=workers)
+        aliases = collect_aliases(index.records())
+    write_alias_file(aliases, alias_path)
+    return stats, duplicates(aliases)
@@ -0,0 +1,129 @@
+"""asyncio front end of 'DocstringParser' for servers which must not block their event loop
+
+Docstrings are parsed in a process pool whose workers build their parser once. Concurrent requests for the same
+text share a single parse, the number of parses in flight is bounded and cancelled requests are withdrawn from
+the pool if they have not started yet.
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional, Tuple
+
+from src.docstring_scanner import in_worker, init_worker, parse_in_worker
+from src.lark_docstring_parser import Docstring, DocstringParser
+
+Result = Tuple[Optional[Docstring], Optional[str]]
+
+
+class AsyncDocstringParser:
+    """parses docstrings in worker processes without blocking the event loop"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        chunksize: int = 16,
+        **options,
+    ):
+        """
+        Args:
+            workers: number of worker processes, defaults to the number of CPUs
+            max_concurrency: maximum number of parses (or chunks of 'parse_many') in flight, defaults to
+                twice the number of workers so that workers do not idle while results are transferred
+            chunksize: number of texts sent to a worker at once by 'parse_many'
+            options: passed to 'DocstringParser', e.g. parser="lalr"
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or 2 * self.workers
+        self.chunksize = chunksize
+        self.options = options
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=init_worker, initargs=(functools.partial(DocstringParser, **options),)
+        )
+        # bound to the running loop, a later loop (e.g. of another 'asyncio.run') gets its own, see '_bind'
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: dict[str, _SharedParse] = {}
+
+    def __enter__(self) -> "AsyncDocstringParser":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def __aenter__(self) -> "AsyncDocstringParser":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """cancels queued parses and shuts the worker processes down"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _bind(self):
+        """creates the semaphore and the shared parses of the running loop, they cannot be used by another loop"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._in_flight = {}
+
+    async def _submit(self, function, argument):
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, argument)
+
+    async def parse(self, text: str) -> Result:
+        """parses the text in a worker, concurrent calls with the same text await the same parse"""
+        self._bind()
+        shared = self._in_flight.get(text)
+        if shared is None:
+            shared = self._in_flight[text] = _SharedParse(asyncio.ensure_future(self._submit(parse_in_worker, text)))
+            shared.task.add_done_callback(lambda _: self._in_flight.pop(text, None))
+        return await shared.wait()
+
+    async def parse_many(self, texts: Iterable[str]) -> list[Result]:
+        """parses the texts in chunks, duplicate texts are parsed once
+
+        Returns:
+            '(docstring, error)' tuples in the order of the texts
+        """
+        self._bind()
+        texts = list(texts)
+        unique = list(dict.fromkeys(texts))
+        chunks = [tuple(unique[i : i + self.chunksize]) for i in range(0, len(unique), self.chunksize)]
+        tasks = [
+            asyncio.ensure_future(self._submit(functools.partial(in_worker, _parse_chunk), chunk)) for chunk in chunks
+        ]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:  # cancelled or failed, withdraw the other chunks
+            for task in tasks:
+                task.cancel()
+            raise
+        parsed = dict(zip(unique, (result for chunk in results for result in chunk)))
+        return [parsed[text] for text in texts]
+
+
+class _SharedParse:
+    """parse awaited by several requests, it is cancelled when the last request is cancelled"""
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+    async def wait(self) -> Result:
+        self.waiters += 1
+        try:
+            return await asyncio.shield(self.task)
+        except asyncio.CancelledError:
+            if self.waiters == 1:
+                self.task.cancel()
+            raise
+        finally:
+            self.waiters -= 1
+
+
+def _parse_chunk(texts: Tuple[str, ...], parser) -> list[Result]:
+    return [parser.parse(text=text) for text in texts]
@@ -0,0 +1,181 @@
+"""Command line interface 'lark-docstring-parser', streams the parsed docstrings as JSON Lines
+
+Inputs are python files, directories of python files, '.jsonl' files or stdin ('-', the default). The functions
+of python sources are read with 'ast' like 'docstring_scanner' does. JSON Lines inputs hold one docstring per
+line, either as JSON string or as object with a "docstring" key.
+
+One JSON record per docstring is written to stdout as soon as its file or chunk is parsed:
+
+    {"module": ..., "qualname": ..., "lineno": ..., "docstring": {...} | null, "error": ... | null}
+
+For JSON Lines inputs module is the file name or "<stdin>", qualname is null and lineno the input line. At most
+a few files or chunks per job are in flight, so memory stays bounded for inputs of any size.
+
+With '--check' the docstrings of python sources are compared to the signatures of their functions instead, see
+'signature_check', and one record per issue is written:
+
+    {"module": ..., "qualname": ..., "lineno": ..., "code": ..., "message": ...}
+"""
+
+import argparse
+import dataclasses
+import functools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, TextIO, Tuple
+
+from src.docstring_scanner import DocstringRecord, in_worker, init_worker, iter_source_files, ordered_map, scan_files
+
+CHUNKSIZE = 256  # docstrings of JSON Lines inputs sent to a worker at once
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="lark-docstring-parser",
+        description="Parses docstrings and writes one JSON record per docstring to stdout.",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=["-"],
+        help="python files, directories, .jsonl files with one docstring per line or - for JSON Lines on stdin",
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes, 0 for all CPUs")
+    parser.add_argument("--errors-only", action="store_true", help="write failed parses only")
+    parser.add_argument("--parser", choices=("earley", "lalr"), default="lalr", help="lark parser (default: lalr)")
+    parser.add_argument("--style", choices=("google", "numpy"), default="google", help="docstring style")
+    parser.add_argument("--check", action="store_true", help="check docstrings against the function signatures")
+    parser.add_argument("--index", metavar="PATH", help="with --check, reuse the parse results of a docstring index")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Returns:
+        exit code, 1 if a docstring or source file failed to parse
+    """
+    argument_parser = build_argument_parser()
+    args = argument_parser.parse_args(argv)
+    if args.style == "numpy" and args.parser != "lalr":
+        argument_parser.error("--style numpy needs --parser lalr")
+    jobs = args.jobs or os.cpu_count() or 1
+    parser_factory = functools.partial(_build_parser, parser=args.parser, style=args.style)
+    if args.check:
+        if any(name == "-" or name.endswith(".jsonl") for name in args.inputs):
+            argument_parser.error("--check needs python files or directories as inputs")
+        return check(args.inputs, parser_factory, jobs, args.index)
+    failed = False
+    try:
+        for records in iter_records(args.inputs, parser_factory, jobs):
+            for record in records:
+                failed |= record.error is not None
+                if record.error is not None or not args.errors_only:
+                    sys.stdout.write(to_json(record) + "\n")
+            sys.stdout.flush()
+    except BrokenPipeError:  # e.g. piped into 'head'
+        sys.stderr.close()  # suppress the error when python flushes stdout at exit
+        return 1
+    return 1 if failed else 0
+
+
+def check(inputs: Iterable[str], parser_factory: Callable, jobs: int, index_path: Optional[str] = None) -> int:
+    """writes the signature issues of the python sources, returns 1 if there are any"""
+    from src.signature_check import check_tree
+
+    index = None
+    if index_path is not None:
+        from src.docstring_index import DocstringIndex
+
+        index = DocstringIndex(index_path, parser_factory=parser_factory)
+    failed = False
+    try:
+        for name in inputs:
+            for issue in check_tree(name, workers=jobs, parser_factory=parser_factory, index=index):
+                failed = True
+                sys.stdout.write(json.dumps(issue._asdict()) + "\n")
+            sys.stdout.flush()
+    except BrokenPipeError:
+        sys.stderr.close()
+        return 1
+    finally:
+        if index is not None:
+            index.close()
+    return 1 if failed else 0
+
+
+def _build_parser(**options):
+    from src.lark_docstring_parser import DocstringParser
+
+    return DocstringParser(**options)
+
+
+def iter_records(inputs: Iterable[str], parser_factory: Callable, jobs: int = 1) -> Iterator[list[DocstringRecord]]:
+    """streams the records of the inputs, one list per python file or chunk of docstrings"""
+    for name in inputs:
+        if name == "-":
+            yield from _iter_jsonl_records(sys.stdin, "<stdin>", parser_factory, jobs)
+        elif name.endswith(".jsonl"):
+            with open(name, encoding="utf-8") as file:
+                yield from _iter_jsonl_records(file, name, parser_factory, jobs)
+        else:
+            yield from scan_files(iter_source_files(name), workers=jobs, parser_factory=parser_factory)
+
+
+def _iter_jsonl_records(
+    file: TextIO, module: str, parser_factory: Callable, jobs: int
+) -> Iterator[list[DocstringRecord]]:
+    chunks = _iter_chunks(file, module)
+    if jobs <= 1:
+        parser = parser_factory()
+        for chunk in chunks:
+            yield _parse_chunk(chunk, parser)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(parser_factory,)) as pool:
+        yield from ordered_map(pool, functools.partial(in_worker, _parse_chunk), chunks, window=4 * jobs)
+
+
+# module and '(lineno, docstring text, error of a malformed line)' of up to 'CHUNKSIZE' input lines
+Chunk = Tuple[str, list[Tuple[int, Optional[str], Optional[str]]]]
+
+
+def _iter_chunks(file: TextIO, module: str) -> Iterator[Chunk]:
+    lines = enumerate(file, start=1)
+    while True:
+        chunk = list(islice(lines, CHUNKSIZE))
+        if not chunk:
+            return
+        yield module, [_read_line(lineno, line) for lineno, line in chunk if line.strip()]
+
+
+def _read_line(lineno: int, line: str) -> Tuple[int, Optional[str], Optional[str]]:
+    try:
+        value = json.loads(line)
+        text = value["docstring"] if isinstance(value, dict) else value
+        if not isinstance(text, str):
+            raise TypeError("docstring is not a string")
+    except (ValueError, KeyError, TypeError) as error:
+        return lineno, None, f"{type(error).__name__}: {error}"
+    return lineno, text, None
+
+
+def _parse_chunk(chunk: Chunk, parser) -> list[DocstringRecord]:
+    module, lines = chunk
+    records = []
+    for lineno, text, error in lines:
+        docstring = None
+        if error is None:
+            docstring, error = parser.parse(text=text)
+        records.append(DocstringRecord(module, None, lineno, docstring, error))
+    return records
+
+
+def to_json(record: DocstringRecord) -> str:
+    docstring = None if record.docstring is None else dataclasses.asdict(record.docstring)
+    return json.dumps({**record._asdict(), "docstring": docstring})
+
+
+if __name__ == "__main__":
+    sys.exit(main())
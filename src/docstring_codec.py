@@ -0,0 +1,123 @@
+"""Compact, versioned binary encoding of 'Docstring' for caches and inter process communication
+
+A record is the tuple of the 8 'Docstring' fields (args and raises as lists of tuples) in marshal format
+version 4, which is written and read by C code and stable since python 3.4. Layout (little endian):
+
+    single  magic b"DSC", format version, record                                          3s B
+    batch   magic b"DSB", format version, record count, end offset of each record          3s B I I*count
+            records, an empty record is a failed parse (None)
+
+A batch is decoded record by record on access, reading it does not copy the buffer. Like pickle, the encoding
+is meant for data written by this module only, not for untrusted input.
+"""
+import marshal
+import struct
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+from src.lark_docstring_parser import Docstring
+
+FORMAT_VERSION = 1
+MARSHAL_VERSION = 4
+MAGIC = b"DSC"
+BATCH_MAGIC = b"DSB"
+HEADER = struct.Struct("<3sB")
+BATCH_HEADER = struct.Struct("<3sBI")
+END = struct.Struct("<I")
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def encode(docstring: Docstring) -> bytes:
+    """the record of a docstring"""
+    return marshal.dumps(
+        (
+            docstring.summary,
+            docstring.description,
+            docstring.args,
+            docstring.returns,
+            docstring.yields,
+            docstring.raises,
+            docstring.alias,
+            docstring.examples,
+        ),
+        MARSHAL_VERSION,
+    )
+
+
+def decode(record: Buffer) -> Docstring:
+    """the docstring of a record"""
+    docstring = Docstring.__new__(Docstring)  # the alias is normalized already, skip '__post_init__'
+    (
+        docstring.summary,
+        docstring.description,
+        docstring.args,
+        docstring.returns,
+        docstring.yields,
+        docstring.raises,
+        docstring.alias,
+        docstring.examples,
+    ) = marshal.loads(record)
+    return docstring
+
+
+def dumps(docstring: Docstring) -> bytes:
+    return HEADER.pack(MAGIC, FORMAT_VERSION) + encode(docstring)
+
+
+def loads(data: Buffer) -> Docstring:
+    if len(data) < HEADER.size or HEADER.unpack_from(data) != (MAGIC, FORMAT_VERSION):
+        raise ValueError(f"no encoded docstring of format version {FORMAT_VERSION}")
+    return decode(memoryview(data)[HEADER.size :])
+
+
+def dumps_many(docstrings: Iterable[Optional[Docstring]]) -> bytes:
+    """encodes many docstrings, e.g. the results of a parse batch, into one buffer"""
+    records = [b"" if docstring is None else encode(docstring) for docstring in docstrings]
+    ends, end = [], 0
+    for record in records:
+        end += len(record)
+        ends.append(end)
+    header = BATCH_HEADER.pack(BATCH_MAGIC, FORMAT_VERSION, len(records))
+    return b"".join((header, struct.pack(f"<{len(ends)}I", *ends), *records))
+
+
+class DocstringBatch(Sequence[Optional[Docstring]]):
+    """read only view of a buffer written by 'dumps_many', records are decoded on access"""
+
+    def __init__(self, data: Buffer):
+        self._buffer = memoryview(data)
+        if len(self._buffer) < BATCH_HEADER.size:
+            raise ValueError(f"no encoded docstring batch of format version {FORMAT_VERSION}")
+        magic, version, self._count = BATCH_HEADER.unpack_from(self._buffer)
+        if (magic, version) != (BATCH_MAGIC, FORMAT_VERSION):
+            raise ValueError(f"no encoded docstring batch of format version {FORMAT_VERSION}")
+        self._start = BATCH_HEADER.size + END.size * self._count  # of the records
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _end(self, index: int) -> int:
+        return END.unpack_from(self._buffer, BATCH_HEADER.size + END.size * index)[0] if index >= 0 else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("docstring batch index out of range")
+        start, end = self._end(index - 1), self._end(index)
+        if start == end:
+            return None
+        return decode(self._buffer[self._start + start : self._start + end])
+
+    def __iter__(self) -> Iterator[Optional[Docstring]]:
+        start = 0
+        for index in range(self._count):
+            end = self._end(index)
+            yield None if start == end else decode(self._buffer[self._start + start : self._start + end])
+            start = end
+
+
+def loads_many(data: Buffer) -> DocstringBatch:
+    return DocstringBatch(data)
@@ -0,0 +1,247 @@
+"""Daemon keeping docstring parsers and their cache warm, reachable over a local Unix domain socket
+
+Short lived tools (editor plugins, pre-commit hooks) send their docstrings to the daemon instead of building
+parsers themselves. Every frame is a 4 byte big endian length followed by the payload:
+
+    request     JSON {"style": "google" | "numpy" | "auto", "texts": [text, ...]}
+    response    JSON {"errors": [error or null, ...]} followed by the 'docstring_codec.dumps_many' batch of
+                the docstrings, or JSON {"error": message} only if the request is malformed
+
+A connection may carry any number of requests. Start the daemon with 'python -m src.docstring_daemon [socket]'.
+"""
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import threading
+from typing import Iterable, Optional, Tuple
+
+from src.docstring_codec import dumps_many, loads_many
+from src.lark_docstring_parser import Docstring, ParseCache, cache_dir
+
+FRAME = struct.Struct(">I")
+MAX_FRAME = 64 * 1024 * 1024
+STYLES = ("google", "numpy", "auto")
+
+Result = Tuple[Optional[Docstring], Optional[str]]
+
+
+def default_socket_path() -> str:
+    """socket of the daemon, set env var 'LARK_DOCSTRING_PARSER_SOCKET' to change it"""
+    return os.environ.get("LARK_DOCSTRING_PARSER_SOCKET") or os.path.join(cache_dir(), "daemon.sock")
+
+
+def send_frame(sock: socket.socket, payload: bytes):
+    sock.sendall(FRAME.pack(len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> Optional[bytes]:
+    """the payload of the next frame, None if the peer closed the connection before a frame"""
+    header = _recv_exactly(sock, FRAME.size)
+    if header is None:
+        return None
+    (length,) = FRAME.unpack(header)
+    if length > MAX_FRAME:
+        raise ValueError(f"frame of {length} bytes exceeds limit of {MAX_FRAME} bytes")
+    payload = _recv_exactly(sock, length)
+    if payload is None:
+        raise ConnectionError("connection closed within a frame")
+    return payload
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = bytearray()
+    while len(chunks) < size:
+        chunk = sock.recv(size - len(chunks))
+        if not chunk:
+            if chunks:
+                raise ConnectionError("connection closed within a frame")
+            return None
+        chunks += chunk
+    return bytes(chunks)
+
+
+class Parsers(dict):
+    """style -> parser, built on first use, "auto" detects the style of each text"""
+
+    def __missing__(self, style: str):
+        if style == "google":
+            from src.fast_docstring_parser import FastDocstringParser
+
+            parser = FastDocstringParser()
+        elif style == "numpy":
+            from src.lark_docstring_parser import DocstringParser
+
+            parser = DocstringParser(parser="lalr", style="numpy", inline_transform=True)
+        elif style == "auto":
+            from src.docstring_dispatch import StyleDispatcher
+
+            parser = StyleDispatcher({"google": self["google"], "numpy": self["numpy"]})
+        else:
+            raise KeyError(style)
+        self[style] = parser
+        return parser
+
+
+class DocstringDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """serves parse requests, one thread per connection
+
+    Parsers are not thread safe, a request borrows an idle set of parsers, so the daemon keeps one set per
+    concurrent request alive. Results are cached across connections.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, cache: Optional[ParseCache] = None):
+        """
+        Args:
+            path: socket path, a stale socket file of a daemon which is no longer running is replaced
+            cache: results shared by all connections
+        """
+        if os.path.exists(path):
+            if _daemon_running(path):
+                raise OSError(f"a daemon is running on '{path}' already")
+            os.remove(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.cache = ParseCache(maxsize=16384) if cache is None else cache
+        self._idle: list[Parsers] = []
+        self._lock = threading.Lock()
+        super().__init__(path, _RequestHandler)
+
+    def parse(self, texts: list[str], style: str) -> list[Result]:
+        with self._lock:
+            parsers = self._idle.pop() if self._idle else Parsers()
+        try:
+            results = []
+            for text in texts:
+                key = self.cache.key(text, namespace=style)
+                result = self.cache.get(key)
+                if result is None:
+                    result = parsers[style].parse(text=text)
+                    self.cache.put(key, result)
+                results.append(result)
+            return results
+        finally:
+            with self._lock:
+                self._idle.append(parsers)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    server: DocstringDaemon
+
+    def handle(self):
+        while True:
+            try:
+                payload = recv_frame(self.request)
+            except (ValueError, ConnectionError):
+                return  # the stream is out of sync, drop the connection
+            if payload is None:
+                return
+            try:
+                request = json.loads(payload)
+                style, texts = request.get("style", "google"), request["texts"]
+                if style not in STYLES or not all(isinstance(text, str) for text in texts):
+                    raise ValueError(f"style must be one of {STYLES} and texts a list of strings")
+            except (ValueError, KeyError, TypeError, AttributeError) as error:
+                send_frame(self.request, json.dumps({"error": f"malformed request: {error}"}).encode())
+                continue
+            results = self.server.parse(texts, style)
+            send_frame(self.request, json.dumps({"errors": [error for _, error in results]}).encode())
+            send_frame(self.request, dumps_many(docstring for docstring, _ in results))
+
+
+def _daemon_running(path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def serve(path: Optional[str] = None):
+    """runs the daemon until it is interrupted"""
+    with DocstringDaemon(path or default_socket_path()) as daemon:
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+class DaemonClient:
+    """parses docstrings in the daemon, or in process if the daemon is not running"""
+
+    def __init__(self, path: Optional[str] = None, timeout: float = 10.0):
+        """
+        Args:
+            path: socket of the daemon, defaults to 'default_socket_path()'
+            timeout: seconds to wait for a response before falling back to in process parsing
+        """
+        self.path = path or default_socket_path()
+        self.timeout = timeout
+        self.fallbacks = 0  # requests parsed in process
+        self._socket: Optional[socket.socket] = None
+        self._parsers = Parsers()
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def parse(self, text: str, style: str = "google") -> Result:
+        return self.parse_many([text], style=style)[0]
+
+    def parse_many(self, texts: Iterable[str], style: str = "google") -> list[Result]:
+        """
+        Args:
+            texts: docstrings
+            style: "google", "numpy" or "auto" to detect the style of each text
+
+        Returns:
+            '(docstring, error)' tuples in the order of the texts
+        """
+        if style not in STYLES:
+            raise ValueError(f"unsupported style '{style}', use one of {STYLES}")
+        texts = list(texts)
+        try:
+            return self._request(texts, style)
+        except OSError:  # daemon not running, stopped or too slow
+            self.close()
+        self.fallbacks += 1
+        parser = self._parsers[style]
+        return [parser.parse(text=text) for text in texts]
+
+    def _request(self, texts: list[str], style: str) -> list[Result]:
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(self.timeout)
+            self._socket.connect(self.path)
+        send_frame(self._socket, json.dumps({"style": style, "texts": texts}).encode())
+        header = recv_frame(self._socket)
+        if header is None:
+            raise ConnectionError("daemon closed the connection")
+        response = json.loads(header)
+        if "error" in response:
+            raise ValueError(response["error"])
+        batch = recv_frame(self._socket)
+        if batch is None:
+            raise ConnectionError("daemon closed the connection")
+        return list(zip(loads_many(batch), response["errors"]))
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,74 @@
+"""Style detection and dispatch of docstrings to the fastest parser of their style
+
+The style is classified by a single regular expression search for numpy style section headers, i.e. a title
+underlined by dashes. Everything else, including plain docstrings without any section, is google style.
+"""
+import re
+from collections import Counter
+from typing import Optional, Tuple
+
+import docstring_parser
+
+from src.fast_docstring_parser import FastDocstringParser
+from src.lark_docstring_parser import Docstring
+
+STYLES = ("google", "numpy")
+
+NUMPY_HEADER = re.compile(r"^[ \t]*[A-Z][a-z]+(?: [A-Z][a-z]+)?[ \t]*\n[ \t]*-{3,}[ \t]*$", re.MULTILINE)
+
+
+def detect_style(text: str) -> str:
+    """returns "numpy" if the text has an underlined section header, "google" otherwise"""
+    return "numpy" if NUMPY_HEADER.search(text) else "google"
+
+
+def _words(text: Optional[str]) -> Optional[str]:
+    """joins the words of a multiline text like the lark grammars do"""
+    return " ".join(text.split()) or None if text else None
+
+
+class NumpydocParser:
+    """parses numpy style docstrings with the 'docstring_parser' package into a 'Docstring'
+
+    'docstring_parser' has no 'Alias' section, so the alias of numpy style docstrings is always None.
+    """
+
+    @staticmethod
+    def parse(text: str) -> Tuple[Optional[Docstring], Optional[str]]:
+        try:
+            parsed = docstring_parser.parse(text, style=docstring_parser.Style.numpydoc)
+        except docstring_parser.ParseError as error:
+            return None, str(error)
+        docstring = Docstring(summary=_words(parsed.short_description), description=_words(parsed.long_description))
+        for meta in parsed.meta:
+            if isinstance(meta, docstring_parser.DocstringParam):
+                docstring.args = docstring.args or []
+                docstring.args.append((meta.arg_name, meta.type_name, _words(meta.description)))
+            elif isinstance(meta, docstring_parser.DocstringReturns):
+                name = "yields" if meta.is_generator else "returns"
+                if getattr(docstring, name) is None:  # a second item continues the first one
+                    setattr(docstring, name, (meta.type_name, _words(meta.description)))
+            elif isinstance(meta, docstring_parser.DocstringRaises):
+                docstring.raises = docstring.raises or []
+                docstring.raises.append((meta.type_name, _words(meta.description)))
+            elif meta.args == ["examples"]:
+                docstring.examples = _words(meta.description)
+        return docstring, None
+
+
+class StyleDispatcher:
+    """parses docstrings of any style with one parser per style, the style of each text is detected first"""
+
+    def __init__(self, parsers: Optional[dict] = None):
+        """
+        Args:
+            parsers: style -> object with a 'parse(text)' method returning '(docstring, error)', defaults to
+                'FastDocstringParser' for google and 'NumpydocParser' for numpy style
+        """
+        self.parsers = {"google": FastDocstringParser(), "numpy": NumpydocParser(), **(parsers or {})}
+        self.styles: Counter[str] = Counter()  # style -> number of parsed docstrings
+
+    def parse(self, text: str) -> Tuple[Optional[Docstring], Optional[str]]:
+        style = detect_style(text)
+        self.styles[style] += 1
+        return self.parsers[style].parse(text=text)
@@ -0,0 +1,176 @@
+"""Incremental, persisted index of parsed docstrings
+
+The index is a SQLite database holding the docstring records of each scanned source file together with the
+file's size, modification time and content hash. An update parses changed files only and prunes deleted files.
+The whole index is invalidated when the grammars, the parser or the index schema change.
+"""
+
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+from lark import __version__ as lark_version
+
+from src.docstring_scanner import DocstringRecord, iter_source_files, scan_files
+from src.fast_docstring_parser import FastDocstringParser
+from src.lark_docstring_parser import Docstring, DocstringParser
+
+SCHEMA_VERSION = 2  # 2: docstrings are parsed with a trailing blank line
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, module TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    path TEXT NOT NULL REFERENCES files (path) ON DELETE CASCADE,
+    qualname TEXT, lineno INTEGER NOT NULL, docstring TEXT, error TEXT
+);
+CREATE INDEX IF NOT EXISTS records_path ON records (path);
+"""
+
+
+@dataclass
+class UpdateStats:
+    parsed: int = 0  # new or changed files
+    touched: int = 0  # modification time changed, content unchanged
+    unchanged: int = 0
+    deleted: int = 0
+
+
+def index_version(parser_factory: Callable) -> str:
+    """hash of everything the stored records depend on"""
+    key = "\n".join(
+        (
+            str(SCHEMA_VERSION),
+            lark_version,
+            factory_name(parser_factory),
+            DocstringParser.google_grammar,
+            DocstringParser.google_grammar_lalr,
+            DocstringParser.numpy_grammar_lalr,
+        )
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def factory_name(parser_factory: Callable) -> str:
+    """stable name of a parser factory, including the bound arguments of a 'functools.partial'"""
+    if isinstance(parser_factory, functools.partial):
+        keywords = sorted(parser_factory.keywords.items())
+        return f"{factory_name(parser_factory.func)}{parser_factory.args!r}{keywords!r}"
+    return f"{parser_factory.__module__}.{parser_factory.__qualname__}"
+
+
+def file_sha256(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+class DocstringIndex:
+    """docstring records of a source tree persisted in a SQLite database"""
+
+    def __init__(self, path: str, parser_factory: Callable = FastDocstringParser):
+        """
+        Args:
+            path: database file, created if missing
+            parser_factory: builds the parser used for changed files
+        """
+        self.parser_factory = parser_factory
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+        version = index_version(parser_factory)
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != version:
+            with self.connection:
+                self.connection.execute("DELETE FROM files")
+                self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> "DocstringIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def update(self, root: str, workers: int = 1) -> UpdateStats:
+        """re-parses new and changed files below root and prunes the files which no longer exist"""
+        stats = UpdateStats()
+        known = {
+            path: (size, mtime_ns, sha256)
+            for path, size, mtime_ns, sha256 in self.connection.execute(
+                "SELECT path, size, mtime_ns, sha256 FROM files"
+            )
+        }
+        changed = []  # (path, module, size, mtime_ns, sha256)
+        with self.connection:
+            for path, module in iter_source_files(root):
+                stat = os.stat(path)
+                entry = known.pop(path, None)
+                if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+                    stats.unchanged += 1
+                    continue
+                sha256 = file_sha256(path)
+                if entry is not None and entry[2] == sha256:
+                    stats.touched += 1
+                    self.connection.execute(
+                        "UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                        (stat.st_size, stat.st_mtime_ns, path),
+                    )
+                    continue
+                changed.append((path, module, stat.st_size, stat.st_mtime_ns, sha256))
+            # files below root which were not found again
+            prefix = os.path.join(os.path.abspath(root), "")
+            deleted = [(path,) for path in known if path.startswith(prefix) or path == os.path.abspath(root)]
+            self.connection.executemany("DELETE FROM files WHERE path = ?", deleted)
+            stats.deleted = len(deleted)
+
+            files = ((path, module) for path, module, *_ in changed)
+            for (path, module, size, mtime_ns, sha256), records in zip(
+                changed, scan_files(files, workers=workers, parser_factory=self.parser_factory)
+            ):
+                self.connection.execute("DELETE FROM files WHERE path = ?", (path,))
+                self.connection.execute(
+                    "INSERT INTO files VALUES (?, ?, ?, ?, ?)", (path, module, size, mtime_ns, sha256)
+                )
+                self.connection.executemany(
+                    "INSERT INTO records VALUES (?, ?, ?, ?, ?)",
+                    [(path, r.qualname, r.lineno, _dumps(r.docstring), r.error) for r in records],
+                )
+                stats.parsed += 1
+        return stats
+
+    def records(self, module: Optional[str] = None, path: Optional[str] = None) -> Iterator[DocstringRecord]:
+        """yields the stored records, optionally of a single module or source file only
+
+        Different roots may hold files with the same module name, 'path' selects a single file.
+        """
+        query = "SELECT module, qualname, lineno, docstring, error FROM records JOIN files USING (path)"
+        conditions, parameters = [], []
+        if module is not None:
+            conditions.append("module = ?")
+            parameters.append(module)
+        if path is not None:
+            conditions.append("path = ?")
+            parameters.append(os.path.abspath(path))
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        for module_, qualname, lineno, docstring, error in self.connection.execute(
+            query + " ORDER BY path, records.rowid", parameters
+        ):
+            yield DocstringRecord(module_, qualname, lineno, _loads(docstring), error)
+
+
+def _dumps(docstring: Optional[Docstring]) -> Optional[str]:
+    return None if docstring is None else json.dumps(dataclasses.asdict(docstring), separators=(",", ":"))
+
+
+def _loads(text: Optional[str]) -> Optional[Docstring]:
+    return None if text is None else Docstring.from_dict(json.loads(text))
@@ -0,0 +1,165 @@
+"""Scanner to extract and parse the docstrings of python functions without importing their modules
+
+Source files are read with 'ast' only, so scanning has no side effects and does not need the dependencies of
+the scanned package.
+"""
+
+import ast
+import functools
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from src.fast_docstring_parser import FastDocstringParser
+from src.lark_docstring_parser import Docstring
+
+SKIPPED_DIRS = ("__pycache__", "node_modules", "venv", "site-packages")
+
+
+class DocstringRecord(NamedTuple):
+    module: str
+    qualname: Optional[str]  # None if the module could not be read
+    lineno: int
+    docstring: Optional[Docstring]
+    error: Optional[str]
+
+
+def iter_source_files(root: str) -> Iterator[Tuple[str, str]]:
+    """yields '(path, module name)' of all python files below root in a stable order"""
+    root = os.path.abspath(root)
+    if os.path.isfile(root):
+        yield root, _module_name(os.path.basename(root))
+        return
+    # module names of a package include the package itself
+    base = os.path.dirname(root) if os.path.isfile(os.path.join(root, "__init__.py")) else root
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in SKIPPED_DIRS)
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                path = os.path.join(dirpath, filename)
+                yield path, _module_name(os.path.relpath(path, base))
+
+
+def _module_name(relpath: str) -> str:
+    parts = relpath[: -len(".py")].split(os.sep)
+    if parts[-1] == "__init__" and len(parts) > 1:
+        parts.pop()
+    return ".".join(parts)
+
+
+def iter_functions(node: ast.AST, prefix: str = "", in_class: bool = False) -> Iterator[Tuple[str, ast.AST, bool]]:
+    """yields '(qualname, node, is method)' of all functions and methods in source order"""
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            qualname = prefix + child.name
+            yield qualname, child, in_class
+            yield from iter_functions(child, qualname + ".<locals>.")
+        elif isinstance(child, ast.ClassDef):
+            yield from iter_functions(child, prefix + child.name + ".", in_class=True)
+        elif isinstance(child, ast.stmt):  # functions in if, try, with, ... blocks
+            yield from iter_functions(child, prefix, in_class)
+
+
+def function_docstring(function: ast.AST) -> Optional[str]:
+    """docstring without its indentation and ending with a blank line, like 'object_docstring.normalize_docstring'"""
+    text = ast.get_docstring(function, clean=True)
+    return None if text is None else text + "\n\n"
+
+
+def iter_function_docstrings(node: ast.AST, prefix: str = "") -> Iterator[Tuple[str, int, str]]:
+    """yields '(qualname, lineno, docstring)' of all functions and methods with a docstring in source order"""
+    for qualname, function, _ in iter_functions(node, prefix):
+        text = function_docstring(function)
+        if text is not None:
+            yield qualname, function.lineno, text
+
+
+def scan_file(path: str, module: str, parser) -> list[DocstringRecord]:
+    """parses the function docstrings of a source file
+
+    Args:
+        path: python source file
+        module: module name of the file
+        parser: object with a 'parse(text)' method returning '(docstring, error)'
+    """
+    try:
+        with open(path, "rb") as file:
+            tree = ast.parse(file.read(), filename=path)
+    except (OSError, SyntaxError, ValueError) as error:
+        lineno = getattr(error, "lineno", None) or 0
+        return [DocstringRecord(module, None, lineno, None, f"{type(error).__name__}: {error}")]
+    records = []
+    for qualname, lineno, text in iter_function_docstrings(tree):
+        docstring, error = parser.parse(text=text)
+        records.append(DocstringRecord(module, qualname, lineno, docstring, error))
+    return records
+
+
+def scan_tree(
+    root: str,
+    workers: int = 1,
+    parser_factory: Callable = FastDocstringParser,
+) -> Iterator[DocstringRecord]:
+    """streams the docstring records of all python files below root
+
+    Args:
+        root: package directory, directory of packages or single python file
+        workers: number of worker processes, files are scanned in process if 1
+        parser_factory: builds the parser, called once per process
+
+    Returns:
+        records in the order of 'iter_source_files'
+    """
+    for records in scan_files(iter_source_files(root), workers=workers, parser_factory=parser_factory):
+        yield from records
+
+
+def scan_files(
+    files: Iterable[Tuple[str, str]],
+    workers: int = 1,
+    parser_factory: Callable = FastDocstringParser,
+) -> Iterator[list[DocstringRecord]]:
+    """streams the docstring records of '(path, module name)' files, one list per file in the order of files"""
+    if workers <= 1:
+        parser = parser_factory()
+        for path, module in files:
+            yield scan_file(path, module, parser)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(parser_factory,)) as pool:
+        yield from ordered_map(pool, functools.partial(in_worker, _scan_file), files, window=4 * workers)
+
+
+def _scan_file(file: Tuple[str, str], parser) -> list[DocstringRecord]:
+    path, module = file
+    return scan_file(path, module, parser)
+
+
+def ordered_map(pool, fn: Callable, items: Iterable, window: int) -> Iterator:
+    """like 'pool.map' but submits at most 'window' items ahead, which bounds memory for long iterables"""
+    pending: deque[Future] = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    for future in pending:
+        yield future.result()
+
+
+_worker_parser = None  # parser of a worker process, see 'init_worker'
+
+
+def init_worker(parser_factory: Callable):
+    """initializer of the process pools of this package, builds the parser of a worker process once"""
+    global _worker_parser
+    _worker_parser = parser_factory()
+
+
+def in_worker(function: Callable, item):
+    """calls 'function(item, parser)' with the parser of the worker process, submitted as
+    'functools.partial(in_worker, function)'"""
+    return function(item, _worker_parser)
+
+
+def parse_in_worker(text: str) -> Tuple[Optional[Docstring], Optional[str]]:
+    return _worker_parser.parse(text=text)
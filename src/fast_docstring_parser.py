@@ -0,0 +1,168 @@
+"""Single pass line scanner for google style docstrings with lark fallback
+
+The scanner accepts the layout described by 'DocstringParser.google_grammar_lalr' (summary, description,
+Args, Returns/Yields, Raises, Alias and Examples sections) and builds a 'Docstring' directly. Whenever it
+meets a line it does not understand, the text is handed over to a lark 'DocstringParser'.
+"""
+
+import re
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from src.lark_docstring_parser import Docstring
+
+if TYPE_CHECKING:
+    from src.lark_docstring_parser import DocstringParser
+
+# position of the sections in the fixed section order, returns and yields exclude each other
+SECTIONS = {"Args:": 1, "Returns:": 2, "Yields:": 2, "Raises:": 3, "Alias:": 4, "Examples:": 5}
+
+WORDS = re.compile(r"[a-zA-Z0-9.`,>=()\[\]/:]+(?: +[a-zA-Z0-9.`,>=()\[\]/:]+)* *")
+INDENT = re.compile(r"(?:    |\t)*")
+ARG = re.compile(r"([*|]*[_a-zA-Z][_a-zA-Z0-9]*)(?: +\(([_a-zA-Z][_a-zA-Z0-9]*)\))?:(?: +(.*))?")
+TYPED = re.compile(r"([_a-zA-Z][_a-zA-Z0-9]*):(?: +(.*))?")
+
+
+def scan(text: str) -> Optional[Docstring]:
+    """scans the text line by line, returns None if the text has to be parsed by lark"""
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()  # text terminated by a new line
+
+    paragraphs = {}  # summary and description words
+    items = {}  # section name -> list of [name, type, words]
+    section = None  # current section name
+    order = 0  # position of the current section in 'SECTIONS'
+    words = None  # words of the current summary, description or item, None if continuation lines are not allowed
+    closed = False  # blank line after the current section header, no more items allowed
+    expect_continuation = False  # item header ended with ":", its description follows on a continuation line
+
+    for line in lines:
+        if not line:  # blank line closes paragraphs and items
+            if expect_continuation:
+                return None
+            words = None
+            closed = True
+            continue
+
+        indent = INDENT.match(line).end()
+        level = line.count("\t", 0, indent) + (indent - line.count("\t", 0, indent)) // 4
+        rest = line[indent:]
+        if expect_continuation and level < 2:
+            return None
+
+        if level == 0:
+            head = rest.split(" ", 1)[0]
+            if head in SECTIONS:
+                if head != rest or SECTIONS[head] <= order or not _complete(section, items):
+                    return None
+                section, order = head[:-1].lower(), SECTIONS[head]
+                items[section] = []
+                words, closed = None, False
+                continue
+            if not WORDS.fullmatch(rest):
+                return None
+            if section is None and not paragraphs:
+                section, words = "summary", rest.split()
+                paragraphs[section] = words
+            elif section == "summary" or (section == "description" and words is not None):
+                if section == "summary":
+                    section = "description"
+                    paragraphs[section] = []
+                words = paragraphs[section]
+                words.extend(rest.split())
+            else:
+                return None
+        elif level == 1:
+            if section == "examples":
+                if not WORDS.fullmatch(rest):
+                    return None
+                items[section].extend(rest.split())
+                continue
+            if section not in items or closed:
+                return None  # items have to follow their header or the previous item without blank lines
+            if section in ("returns", "yields", "alias") and items[section]:
+                return None  # single item sections
+            if section == "alias":
+                if not WORDS.fullmatch(rest):
+                    return None
+                words = rest.split()
+                items[section].append([None, None, words])
+                continue
+            match = (ARG if section == "args" else TYPED).fullmatch(rest)
+            if not match:
+                return None
+            if section == "args":
+                name, type_, description = match.groups()
+            else:
+                name, (type_, description) = None, match.groups()
+            if description is None:
+                expect_continuation = True
+                words = []
+            elif WORDS.fullmatch(description):
+                words = description.split()
+            else:
+                return None
+            items[section].append([name, type_, words])
+        else:
+            if section == "examples":
+                if not WORDS.fullmatch(rest):
+                    return None
+                items[section].extend(rest.split())
+                continue
+            if words is None or not WORDS.fullmatch(rest):
+                return None
+            words.extend(rest.split())
+            expect_continuation = False
+
+    if expect_continuation or not _complete(section, items):
+        return None
+
+    properties = {name: " ".join(words) for name, words in paragraphs.items()}
+    if "args" in items:
+        properties["args"] = [(name, type_, " ".join(words)) for name, type_, words in items["args"]]
+    for name in ("returns", "yields"):
+        if name in items:
+            _, type_, words = items[name][0]
+            properties[name] = (type_, " ".join(words))
+    if "raises" in items:
+        properties["raises"] = [(type_, " ".join(words)) for _, type_, words in items["raises"]]
+    if "alias" in items:
+        properties["alias"] = " ".join(items["alias"][0][2])
+    if "examples" in items:
+        properties["examples"] = " ".join(items["examples"]) or None
+    return Docstring(**properties)
+
+
+def _complete(section: Optional[str], items: dict[str, list]) -> bool:
+    """all sections but 'examples' require at least one item"""
+    return section not in items or section == "examples" or len(items[section]) > 0
+
+
+class FastDocstringParser:
+    """parses google style docstrings with 'scan', falls back to a lark 'DocstringParser'"""
+
+    def __init__(self, fallback: Optional["DocstringParser"] = None):
+        """
+        Args:
+            fallback: parser for docstrings 'scan' cannot handle, a LALR 'DocstringParser' is created on demand
+        """
+        self.fallback = fallback
+        self.parses = 0
+        self.fallbacks = 0
+
+    @property
+    def fallback_rate(self) -> float:
+        """share of docstrings parsed by the fallback parser"""
+        return self.fallbacks / self.parses if self.parses else 0.0
+
+    def parse(self, text: str) -> Tuple[Optional[Docstring], Optional[str]]:
+        self.parses += 1
+        docstring = scan(text)
+        if docstring is not None:
+            return docstring, None
+        self.fallbacks += 1
+        if self.fallback is None:
+            from src.lark_docstring_parser import DocstringParser  # imports lark
+
+            self.fallback = DocstringParser(parser="lalr")
+        return self.fallback.parse(text=text)
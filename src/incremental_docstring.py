@@ -0,0 +1,76 @@
+"""Incremental re-parsing of google style docstrings for editors
+
+An edit only invalidates the sections it touches. 'reparse' splits the edited text at its section headers, parses
+the touched sections on their own and takes all other fields from the previous result. The result equals a full
+parse of the edited text, whenever the sections cannot be parsed on their own the whole text is parsed.
+"""
+from typing import NamedTuple, Optional, Tuple
+
+from src.lark_docstring_parser import Docstring
+from src.lazy_docstring import (
+    SECTION_FIELDS,
+    default_parser,
+    fills_section_only,
+    section_spans,
+    section_value,
+    sections_separated,
+)
+
+class Edit(NamedTuple):
+    """replaces 'text[start:end]' of the previous text by 'text'"""
+
+    start: int
+    end: int
+    text: str
+
+    def apply(self, text: str) -> str:
+        return text[: self.start] + self.text + text[self.end :]
+
+
+def reparse(
+    text: str, docstring: Optional[Docstring], edit: Edit, parser=None
+) -> Tuple[Optional[Docstring], Optional[str]]:
+    """parses the edited text, reusing the fields of all sections which are not touched by the edit
+
+    Args:
+        text: previous text
+        docstring: result of parsing the previous text with the same parser, None if the parse failed
+        edit: change of the previous text
+        parser: object with a 'parse(text)' method returning '(docstring, error)', defaults to the parser of
+            'lazy_docstring'
+
+    Returns:
+        '(docstring, error)' of the edited text
+    """
+    parser = parser or default_parser()
+    new_text = edit.apply(text)
+    if docstring is None:  # failed
+        return parser.parse(text=new_text)
+    old_spans, new_spans = section_spans(text), section_spans(new_text)
+    if old_spans is None or new_spans is None or not sections_separated(new_text, new_spans):
+        return parser.parse(text=new_text)
+    if sum(start != end for _, start, end in new_spans) < 2:  # nothing to reuse
+        return parser.parse(text=new_text)
+    old_spans = {header: (start, end) for header, start, end in old_spans}
+    edit_end = edit.start + len(edit.text)  # in the edited text
+    shift = len(edit.text) - (edit.end - edit.start)
+    fields = {}
+    for header, start, end in new_spans:
+        if end <= edit.start:  # before the edit
+            unchanged = old_spans.get(header) == (start, end)
+        elif start >= edit_end:  # after the edit
+            unchanged = old_spans.get(header) == (start - shift, end - shift)
+        else:
+            unchanged = False
+        if unchanged:
+            section = docstring
+        elif start == end:  # no text before the first header
+            continue
+        else:
+            section, error = parser.parse(text=new_text[start:end])
+            if error is not None or not fills_section_only(section, header):  # report the result of a full parse
+                return parser.parse(text=new_text)
+        for name in SECTION_FIELDS[header]:
+            value = section_value(section, name)
+            fields[name] = list(value) if isinstance(value, list) else value
+    return Docstring(**fields), None
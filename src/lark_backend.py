@@ -0,0 +1,479 @@
+"""lark based part of 'lark_docstring_parser': grammars, transformers and 'DocstringParser'
+
+'lark_docstring_parser' imports this module, and with it lark, on first access of one of its 'LAZY_NAMES', so
+importing 'lark_docstring_parser' for 'Docstring' or the caches alone stays cheap.
+"""
+import functools
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Tuple, Optional, Union
+
+from lark import Lark, Token
+from lark import UnexpectedToken, Transformer
+from lark.exceptions import UnexpectedCharacters, UnexpectedEOF
+
+from src.lark_docstring_parser import (
+    Docstring,
+    ParseCache,
+    ParseLimitExceeded,
+    ParseLimits,
+    ParseStats,
+    cache_file,
+    lines_to_str,
+    tokens_to_str,
+    tokens_to_strs,
+)
+
+
+class TreeToDocstring(Transformer):
+    """transforms lark trees to dicts"""
+
+    @staticmethod
+    def start(dict_list: list[dict]) -> Docstring:
+        properties = {k: v for dict_ in dict_list for k, v in dict_.items()}  # reduce to single dict
+        return Docstring(**properties)
+
+    @staticmethod
+    def summary(tokens: list[Token]) -> dict[str, str]:
+        return {"summary": tokens_to_str(tokens, type_="WORD")}
+
+    @staticmethod
+    def description(tokens: list[Token]) -> dict[str, str]:
+        return {"description": tokens_to_str(tokens, type_="WORD")}
+
+    @staticmethod
+    def args(token_lists: list[list[Token]]) -> dict[str, list[tuple[str, str, str]]]:
+        return {"args": [tl for tl in token_lists if isinstance(tl, tuple)]}
+
+    @staticmethod
+    def arg(tokens: list[Token]) -> tuple[str, str, str]:
+        values = tokens_to_strs(tokens)
+        return values.get("NAME"), values.get("TYPE"), values.get("WORD")
+
+    @staticmethod
+    def returns(tokens: list[Token]) -> dict[str, tuple[str, str]]:
+        values = tokens_to_strs(tokens)
+        return {"returns": (values.get("TYPE"), values.get("WORD"))}
+
+    @staticmethod
+    def yields(tokens: list[Token]) -> dict[str, tuple[str, str]]:
+        values = tokens_to_strs(tokens)
+        return {"yields": (values.get("TYPE"), values.get("WORD"))}
+
+    @staticmethod
+    def raises(token_lists: list[list[Token]]) -> dict[str, list[tuple]]:
+        return {"raises": ([tl for tl in token_lists if isinstance(tl, tuple)])}
+
+    @staticmethod
+    def error(tokens: list[Token]) -> tuple[str, str]:
+        values = tokens_to_strs(tokens)
+        return values.get("TYPE"), values.get("WORD")
+
+    @staticmethod
+    def alias(tokens: list[Token]) -> dict[str, str]:
+        return {"alias": tokens_to_str(tokens, type_="WORD")}
+
+    @staticmethod
+    def examples(tokens: list[Token]) -> dict[str, str]:
+        return {"examples": tokens_to_str(tokens, type_="WORD")}
+
+
+tree_to_docstring = TreeToDocstring()  # stateless, shared by all parsers
+
+
+class NumpyTreeToDocstring(TreeToDocstring):
+    """transforms lark trees of 'numpy_grammar_lalr' to dicts
+
+    Texts are 'LINE' or 'INDENTED' tokens, their words are joined like the 'WORD' tokens of the google grammars.
+    The first line of an item is "name : type" (parameters) or the type (returns, yields, raises).
+    """
+
+    @staticmethod
+    def summary(tokens: list[Token]) -> dict[str, str]:
+        return {"summary": lines_to_str(tokens)}
+
+    @staticmethod
+    def description(tokens: list[Token]) -> dict[str, str]:
+        return {"description": lines_to_str(tokens)}
+
+    @staticmethod
+    def arg(tokens: list[Token]) -> tuple[str, str, str]:
+        name, _, type_ = tokens[0].partition(":")
+        return name.strip(), type_.strip() or None, lines_to_str(tokens[1:])
+
+    @staticmethod
+    def error(tokens: list[Token]) -> tuple[str, str]:
+        name, _, type_ = tokens[0].partition(":")
+        return type_.strip() or name.strip(), lines_to_str(tokens[1:])
+
+    @staticmethod
+    def returns(items: list[tuple[str, str]]) -> dict[str, tuple[str, str]]:
+        return {"returns": items[0] if items else None}  # like 'docstring_dispatch.NumpydocParser'
+
+    @staticmethod
+    def yields(items: list[tuple[str, str]]) -> dict[str, tuple[str, str]]:
+        return {"yields": items[0] if items else None}
+
+    @staticmethod
+    def alias(tokens: list[Token]) -> dict[str, str]:
+        return {"alias": lines_to_str(tokens)}
+
+    @staticmethod
+    def examples(tokens: list[Token]) -> dict[str, str]:
+        return {"examples": lines_to_str(tokens)}
+
+    @staticmethod
+    def ignored(tokens: list[Token]) -> dict:
+        return {}
+
+
+numpy_tree_to_docstring = NumpyTreeToDocstring()
+
+
+class _TimedTransformer(Transformer):
+    """adds the time to build the 'Docstring' to the "post_process" phase of an instrumented parser"""
+
+    def __init__(self, transformer: TreeToDocstring, parser: "DocstringParser"):
+        super().__init__()
+        self.transformer = transformer
+        self.parser = parser
+
+    def __getattr__(self, name: str):
+        if name == "transformer":  # not set yet, e.g. while unpickling
+            raise AttributeError(name)
+        return getattr(self.transformer, name)
+
+    def start(self, dict_list: list[dict]) -> Docstring:
+        start = time.perf_counter()
+        docstring = self.transformer.start(dict_list)
+        self.parser._seconds["post_process"] += time.perf_counter() - start
+        return docstring
+
+
+class _TimedLexer:
+    """wraps the lexer of the lalr frontend, adds the time spent per token to the "lex" phase"""
+
+    def __init__(self, lexer, parser: "DocstringParser"):
+        self.lexer = lexer
+        self.parser = parser
+
+    def make_lexer_state(self, text):
+        return self.lexer.make_lexer_state(text)
+
+    def lex(self, lexer_state, parser_state):
+        tokens = self.lexer.lex(lexer_state, parser_state)
+        seconds = self.parser._seconds
+        while True:
+            start = time.perf_counter()
+            try:
+                token = next(tokens)
+            except StopIteration:
+                seconds["lex"] += time.perf_counter() - start
+                return
+            seconds["lex"] += time.perf_counter() - start
+            self.parser._tokens += 1
+            yield token
+
+
+class DocstringParser(Lark):
+    """parses google or numpy style docstrings of module level python functions"""
+
+    google_grammar = r"""
+    start:          summary? description? args? (returns | yields)? raises? alias? examples?
+
+    summary:        _line NL
+    description:    _line+ NL
+    args:           "Args"     ":" NL arg+ NL
+    returns:        "Returns"  ":" NL TAB _type NL
+    yields:         "Yields"   ":" NL TAB _type NL
+    raises:         "Raises"   ":" NL error+ NL
+    examples:       "Examples" ":" NL [ ( TAB _line ) | NL ]+ NL
+    alias:          "Alias"    ":" NL TAB _line NL
+
+    arg:            TAB NAME [ SP "(" TYPE ")" ] ":" ( SP | NL ) _line+
+    error:          TAB _type
+    _type:          TYPE ":" ( SP | NL ) _line+
+    _line:          WORD (SP WORD)* NL [ TAB TAB WORD (SP WORD)* NL ]
+
+    NAME:           /[\*|\*\*]*[_a-zA-Z][_a-zA-Z0-9]*/
+    TYPE:           /[_a-zA-Z][_a-zA-Z0-9]*/
+    WORD:           /[a-zA-Z0-9.`,>=()\[\]\/:]/+
+    TAB:            "    " | "  " | "\t"
+    NL:             "\n"
+    SP:             /[ ]/+
+    """
+
+    # unambiguous variant of 'google_grammar' for the deterministic LALR(1) parser:
+    # - section headers are single tokens which the contextual lexer tells apart from words
+    # - continuation lines are recognized by the lexer as a deeper indentation (_CONT)
+    # - the first paragraph is always the summary, a description may only follow a summary
+    # - indentation is 4 spaces or a tab
+    google_grammar_lalr = r"""
+    start:          _NL* _head? _args? _returns? _raises? _alias? examples?
+
+    _head:          summary _NL* ( description _NL* )?
+    _args:          args _NL*
+    _returns:       ( returns | yields ) _NL*
+    _raises:        raises _NL*
+    _alias:         alias _NL*
+
+    summary:        _text
+    description:    _text+
+    args:           "Args:"     _NL arg+
+    returns:        "Returns:"  _NL _TAB _type
+    yields:         "Yields:"   _NL _TAB _type
+    raises:         "Raises:"   _NL error+
+    examples:       "Examples:" _NL ( _example | _NL )*
+    alias:          "Alias:"    _NL _TAB _text
+
+    arg:            _TAB NAME [ _SP "(" TYPE ")" ] ":" _desc
+    error:          _TAB _type
+    _type:          TYPE ":" _desc
+    _desc:          _SP _text | _NL _CONT _text
+    _example:       ( _TAB | _CONT ) _words _NL
+    _text:          _words _NL ( _CONT _words _NL )*
+    _words:         WORD ( _SP WORD )* _SP?
+
+    NAME:           /[\*|\*\*]*[_a-zA-Z][_a-zA-Z0-9]*/
+    TYPE:           /[_a-zA-Z][_a-zA-Z0-9]*/
+    WORD:           /[a-zA-Z0-9.`,>=()\[\]\/:]/+
+    _CONT:          /(?:    |\t){2,}/
+    _TAB:           /    |\t/
+    _NL:            "\n"
+    _SP:            /[ ]/+
+    """
+
+    # numpy style for the lalr parser:
+    # - section headers are single tokens including their underline, sections may appear in any order
+    # - sections absorb the blank lines following them, unsupported sections are parsed and ignored
+    # - whole lines are tokens, which keeps the number of tokens (and so the parse time) low
+    # - items are a line ("name : type" or the type) followed by indented lines, which may be separated by blank lines
+    # - 'Docstring' holds one return value, the first 'Returns' and 'Yields' item is kept like 'NumpydocParser' does
+    numpy_grammar_lalr = r"""
+    start:          _BLANK* _head? _section*
+
+    _head:          summary ( _BLANK+ description? )?
+    _section:       args | returns | yields | raises | alias | examples | ignored
+
+    summary:        LINE+
+    description:    LINE ( LINE | _BLANK )*
+    args:           _PARAMETERS ( arg | _BLANK )*
+    returns:        _RETURNS    ( error | _BLANK )*
+    yields:         _YIELDS     ( error | _BLANK )*
+    raises:         _RAISES     ( error | _BLANK )*
+    alias:          _ALIAS      ( LINE | INDENTED | _BLANK )*
+    examples:       _EXAMPLES   ( LINE | INDENTED | _BLANK )*
+    ignored:        _IGNORED    ( LINE | INDENTED | _BLANK )*
+
+    arg:            LINE ( INDENTED | _PARAGRAPH )*
+    error:          LINE ( INDENTED | _PARAGRAPH )*
+
+    _PARAMETERS.2:  /Parameters\n-{3,}[ \t]*\n/
+    _RETURNS.2:     /Returns\n-{3,}[ \t]*\n/
+    _YIELDS.2:      /Yields\n-{3,}[ \t]*\n/
+    _RAISES.2:      /Raises\n-{3,}[ \t]*\n/
+    _ALIAS.2:       /Alias\n-{3,}[ \t]*\n/
+    _EXAMPLES.2:    /Examples\n-{3,}[ \t]*\n/
+    _IGNORED.2:     /(?:Attributes|Methods|Other Parameters|Receives|Warns|Warnings|See Also|Notes|References)\n-{3,}[ \t]*\n/
+    LINE:           /[^\s][^\n]*\n/
+    INDENTED:       /[ \t]+[^\s][^\n]*\n/
+    _BLANK:         /[ \t]*\n/
+    _PARAGRAPH.2:   /(?:[ \t]*\n)+(?=[ \t]+[^\s])/
+    """
+
+    def __init__(
+        self,
+        parser: str = "earley",
+        cache: Union[bool, str] = False,
+        parse_cache: Optional[ParseCache] = None,
+        inline_transform: bool = False,
+        limits: Optional[ParseLimits] = None,
+        stats: Optional[ParseStats] = None,
+        style: str = "google",
+        **kwargs,
+    ):
+        """
+        Args:
+            parser: "earley" (default) or "lalr"; "lalr" uses 'google_grammar_lalr' with lark's contextual lexer
+            cache: "lalr" only; True stores the analyzed grammar in 'cache_dir()', a string names another directory
+            parse_cache: caches the results of 'parse', can be shared by several parsers
+            inline_transform: "lalr" only; builds the 'Docstring' while parsing instead of transforming a parse tree
+            limits: worst case guards, failing parses return an error like syntax errors do
+            stats: records per phase timings and counters, the worker processes of 'parse_many' are not instrumented
+            style: "google" (default) or "numpy"; "numpy" requires parser "lalr" and uses 'numpy_grammar_lalr'
+        """
+        if style not in ("google", "numpy"):
+            raise ValueError(f"unsupported style '{style}', use 'google' or 'numpy'")
+        if style == "numpy" and parser != "lalr":
+            raise ValueError("style 'numpy' requires parser 'lalr'")
+        self.style = style
+        self.parse_cache = parse_cache
+        self.limits = limits
+        self.stats = stats
+        self._transformer = tree_to_docstring if style == "google" else numpy_tree_to_docstring
+        if stats is not None:
+            self._transformer = _TimedTransformer(self._transformer, self)
+        self.init_options = dict(
+            parser=parser, cache=cache, inline_transform=inline_transform, limits=limits, style=style, **kwargs
+        )
+        if parser == "lalr":
+            grammar = self.google_grammar_lalr if style == "google" else self.numpy_grammar_lalr
+            options = dict(grammar=grammar, parser="lalr", lexer="contextual", **kwargs)
+            if inline_transform:
+                options["transformer"] = self._transformer
+            if cache:
+                options["cache"] = cache_file(directory=None if cache is True else cache, **options)
+            try:
+                super().__init__(**options)
+            except (EOFError, pickle.UnpicklingError):  # truncated cache file, e.g. by a concurrent writer
+                if not cache:
+                    raise
+                os.remove(options["cache"])
+                super().__init__(**options)
+        elif cache or inline_transform:
+            raise ValueError("cache and inline_transform require parser 'lalr'")
+        elif parser == "earley":
+            super().__init__(
+                grammar=self.google_grammar,
+                parser="earley",  # supports rule priority
+                **kwargs,
+            )
+        else:
+            raise ValueError(f"unsupported parser '{parser}', use 'earley' or 'lalr'")
+        self._steps = 0
+        self._deadline = None
+        self._seconds = dict.fromkeys(ParseStats.PHASES, 0.0)  # of the current parse
+        self._tokens = 0
+        if stats is not None:
+            self._instrument()
+        if parser == "earley" and limits is not None and (limits.max_steps is not None or limits.timeout is not None):
+            self._guard_earley()
+
+    def _instrument(self):
+        """times the lexer, an uninstrumented parser runs lark's code paths unchanged"""
+        if self.options.parser == "lalr":
+            self.parser.lexer = _TimedLexer(self.parser.lexer, self)
+            return
+        earley = self.parser.parser  # the dynamic lexer of the earley parser matches terminals on demand
+        match = earley.term_matcher
+
+        def timed_match(term, text, index=0):
+            start = time.perf_counter()
+            matched = match(term, text, index)
+            self._seconds["lex"] += time.perf_counter() - start
+            if matched:
+                self._tokens += 1
+            return matched
+
+        earley.term_matcher = timed_match
+
+    def _guard_earley(self):
+        """counts the terminal matches of the earley parser, which grow polynomially with the input"""
+        earley = self.parser.parser  # lark's xearley parser, looks up its 'term_matcher' per parse
+        match = earley.term_matcher
+        max_steps = self.limits.max_steps
+
+        def guarded_match(term, text, index=0):
+            self._steps += 1
+            if max_steps is not None and self._steps > max_steps:
+                raise ParseLimitExceeded(f"parse exceeds limit of {max_steps} steps")
+            if self._deadline is not None and self._steps & 0xFF == 0 and time.perf_counter() > self._deadline:
+                raise ParseLimitExceeded(f"parse exceeds timeout of {self.limits.timeout} seconds")
+            return match(term, text, index)
+
+        earley.term_matcher = guarded_match
+
+    def parse(self, text: str, **kwargs) -> Tuple[Optional[Docstring], Optional[str]]:
+        if self.limits is not None:  # the text of the caller, not the normalized one
+            error = self.limits.check(text)
+            if error is not None:
+                return None, error
+        # the last line is terminated by a new line, the earley grammar ends each section with a blank line as well
+        text = text.rstrip() + ("\n" if self.options.parser == "lalr" else "\n\n")
+        if self.parse_cache is None or kwargs:
+            return self._guarded_parse(text, **kwargs)
+        key = self.parse_cache.key(text, namespace=f"{self.style}-{self.options.parser}")
+        result = self.parse_cache.get(key)
+        if result is None:
+            try:
+                result = self._parse(text)
+            except ParseLimitExceeded as error:  # depends on the load of the machine, not cached
+                return None, str(error)
+            self.parse_cache.put(key, result)
+        return result
+
+    def _guarded_parse(self, text: str, **kwargs) -> Tuple[Optional[Docstring], Optional[str]]:
+        try:
+            return self._parse(text, **kwargs)
+        except ParseLimitExceeded as error:
+            return None, str(error)
+
+    def _parse(self, text: str, **kwargs) -> Tuple[Optional[Docstring], Optional[str]]:
+        self._steps = 0
+        if self.limits is not None and self.limits.timeout is not None:
+            self._deadline = time.perf_counter() + self.limits.timeout
+        if self.stats is not None:
+            return self._instrumented_parse(text, **kwargs)
+        try:
+            tree = super().parse(text=text, **kwargs)
+            if self.options.transformer is not None:
+                return tree, None  # already transformed
+            # print("\n" + tree.pretty())
+            return self._transformer.transform(tree), None
+        except (UnexpectedCharacters, UnexpectedToken, UnexpectedEOF) as error:
+            return None, ", ".join(error.args)
+
+    def _instrumented_parse(self, text: str, **kwargs) -> Tuple[Optional[Docstring], Optional[str]]:
+        seconds = self._seconds = dict.fromkeys(ParseStats.PHASES, 0.0)  # "lex" and "post_process" added by hooks
+        self._tokens = 0
+        docstring, error, parsed = None, None, None
+        start = time.perf_counter()
+        try:
+            tree = super().parse(text=text, **kwargs)
+            parsed = time.perf_counter()
+            docstring = tree if self.options.transformer is not None else self._transformer.transform(tree)
+        except (UnexpectedCharacters, UnexpectedToken, UnexpectedEOF) as exception:
+            error = ", ".join(exception.args)
+        except ParseLimitExceeded as exception:
+            error = str(exception)
+            raise
+        finally:
+            end = time.perf_counter()
+            if parsed is None:
+                parsed = end
+            if self.options.transformer is None:
+                seconds["transform"] = end - parsed - seconds["post_process"]
+                seconds["parse"] = parsed - start - seconds["lex"]
+            else:  # the docstring is built while parsing
+                seconds["parse"] = parsed - start - seconds["lex"] - seconds["post_process"]
+            self.stats.record(seconds, self._tokens, docstring, error)
+        return docstring, error
+
+    def parse_many(
+        self,
+        texts: Iterable[str],
+        workers: Optional[int] = None,
+        chunksize: int = 64,
+    ) -> list[Tuple[Optional[Docstring], Optional[str]]]:
+        """parses the texts in a process pool, each worker process builds its parser once
+
+        Args:
+            texts: docstrings to parse
+            workers: number of worker processes, defaults to the number of CPUs
+            chunksize: number of texts sent to a worker at once, batches smaller than two chunks are parsed serially
+
+        Returns:
+            '(docstring, error)' tuples in the order of the texts
+        """
+        texts = list(texts)
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(texts) < 2 * chunksize:
+            return [self.parse(text=text) for text in texts]
+        from src.docstring_scanner import init_worker, parse_in_worker
+
+        workers = min(workers, -(-len(texts) // chunksize))  # no idle workers
+        factory = functools.partial(DocstringParser, **self.init_options)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(factory,)) as pool:
+            return list(pool.map(parse_in_worker, texts, chunksize=chunksize))
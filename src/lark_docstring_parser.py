@@ -1,14 +1,51 @@
-"""Parser to parse google style docstrings of module level python functions
+"""Parser to parse google and numpy style docstrings of module level python functions
 
 For google style see: https://google.github.io/styleguide/pyguide.html#381-docstrings)
+For numpy style see: https://numpydoc.readthedocs.io/en/latest/format.html#sections
+
+lark is imported on first access of 'DocstringParser' or the transformers (see 'LAZY_NAMES') and grammars are
+compiled when a 'DocstringParser' is created, so importing the module for 'Docstring' alone is cheap.
 """
+
+import copy
+import hashlib
+import os
 import string
+import sys
+import threading
+from collections import Counter, OrderedDict
 from dataclasses import dataclass
-from typing import Tuple, Optional
+from typing import TYPE_CHECKING, NamedTuple, Tuple, Optional
+
+if TYPE_CHECKING:
+    from lark import Token
+    from src.lark_backend import DocstringParser, NumpyTreeToDocstring, TreeToDocstring
+
+# names defined by 'lark_backend', which imports lark, the module is imported on first access of one of them
+LAZY_NAMES = (
+    "DocstringParser",
+    "TreeToDocstring",
+    "NumpyTreeToDocstring",
+    "tree_to_docstring",
+    "numpy_tree_to_docstring",
+)
+
+
+def __getattr__(name: str):
+    if name in LAZY_NAMES:
+        from src import lark_backend
+
+        return getattr(lark_backend, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+WHITESPACE = {ord(c): None for c in string.whitespace}
 
-from lark import Lark, Token
-from lark import UnexpectedToken, Transformer
-from lark.exceptions import UnexpectedCharacters
+
+def normalize_alias(alias: str) -> str:
+    """aliases are lookup keys, so they are compared without white space and case"""
+    alias = alias.translate(WHITESPACE)  # white space elimination
+    return alias.casefold()  # aggressive lower case conversion
 
 
 @dataclass
@@ -23,119 +60,270 @@ class Docstring:
     examples: Optional[str] = None
 
     def __post_init__(self):
-        self.alias = self.alias.translate({ord(c): None for c in string.whitespace})  # white space elimination
-        self.alias = self.alias.casefold()  # aggressive lower case conversion
+        if self.alias is None:
+            return
+        self.alias = normalize_alias(self.alias)
 
+    @classmethod
+    def from_dict(cls, properties: dict) -> "Docstring":
+        """inverse of 'dataclasses.asdict', restores the tuples lost e.g. by a JSON round trip"""
+        properties = dict(properties)
+        for name in ("args", "raises"):
+            if properties.get(name) is not None:
+                properties[name] = [tuple(item) for item in properties[name]]
+        for name in ("returns", "yields"):
+            if properties.get(name) is not None:
+                properties[name] = tuple(properties[name])
+        return cls(**properties)
 
-def tokens_to_str(tokens: list[Token], type_: str) -> str:
-    return " ".join([token.value for token in tokens if token.type == type_]) or None
 
+class Arg(NamedTuple):
+    name: str
+    type: Optional[str]
+    description: Optional[str]
 
-class TreeToDocstring(Transformer):
-    """transforms lark trees to dicts"""
 
-    @staticmethod
-    def start(dict_list: list[dict]) -> Docstring:
-        properties = {k: v for dict_ in dict_list for k, v in dict_.items()}  # reduce to single dict
-        return Docstring(**properties)
+class Raise(NamedTuple):
+    type: str
+    description: Optional[str]
 
-    @staticmethod
-    def summary(tokens: list[Token]) -> dict[str, str]:
-        return {"summary": tokens_to_str(tokens, type_="WORD")}
 
-    @staticmethod
-    def description(tokens: list[Token]) -> dict[str, str]:
-        return {"description": tokens_to_str(tokens, type_="WORD")}
+class CompactDocstring(NamedTuple):
+    """immutable, tuple based variant of 'Docstring' for holding large numbers of docstrings in memory
 
-    @staticmethod
-    def args(token_lists: list[list[Token]]) -> dict[str, list[tuple[str, str, str]]]:
-        return {"args": [tl for tl in token_lists if isinstance(tl, tuple)]}
+    Typed 'Arg' and 'Raise' records compare equal to the plain tuples of 'Docstring'.
+    """
 
-    @staticmethod
-    def arg(tokens: list[Token]) -> tuple[str, str, str]:
-        return (
-            tokens_to_str(tokens, type_="NAME"),
-            tokens_to_str(tokens, type_="TYPE"),
-            tokens_to_str(tokens, type_="WORD"),
+    summary: Optional[str] = None
+    description: Optional[str] = None
+    args: Optional[tuple[Arg, ...]] = None
+    returns: Optional[tuple[str, str]] = None
+    yields: Optional[tuple[str, str]] = None
+    raises: Optional[tuple[Raise, ...]] = None
+    alias: Optional[str] = None
+    examples: Optional[str] = None
+
+    @classmethod
+    def from_docstring(cls, docstring: Docstring, intern: bool = True) -> "CompactDocstring":
+        """
+        Args:
+            docstring: docstring to convert
+            intern: share repeated identifiers and type names like 'str', 'bool' or 'ValueError'
+        """
+        _intern = sys.intern if intern else _identity
+        args = returns = yields = raises = None
+        if docstring.args is not None:
+            args = tuple(Arg(_intern(name), type_ and _intern(type_), text) for name, type_, text in docstring.args)
+        if docstring.returns is not None:
+            returns = (_intern(docstring.returns[0]), docstring.returns[1])
+        if docstring.yields is not None:
+            yields = (_intern(docstring.yields[0]), docstring.yields[1])
+        if docstring.raises is not None:
+            raises = tuple(Raise(_intern(type_), text) for type_, text in docstring.raises)
+        return cls(
+            summary=docstring.summary,
+            description=docstring.description,
+            args=args,
+            returns=returns,
+            yields=yields,
+            raises=raises,
+            alias=docstring.alias and _intern(docstring.alias),
+            examples=docstring.examples,
         )
 
-    @staticmethod
-    def returns(tokens: list[Token]) -> dict[str, tuple[str, str]]:
-        return {
-            "returns": (
-                tokens_to_str(tokens, type_="TYPE"),
-                tokens_to_str(tokens, type_="WORD"),
-            )
-        }
+    def to_docstring(self) -> Docstring:
+        return Docstring(
+            summary=self.summary,
+            description=self.description,
+            args=None if self.args is None else [tuple(arg) for arg in self.args],
+            returns=self.returns,
+            yields=self.yields,
+            raises=None if self.raises is None else [tuple(raise_) for raise_ in self.raises],
+            alias=self.alias,
+            examples=self.examples,
+        )
 
-    @staticmethod
-    def yields(tokens: list[Token]) -> dict[str, tuple[str, str]]:
-        return {
-            "yields": (
-                tokens_to_str(tokens, type_="TYPE"),
-                tokens_to_str(tokens, type_="WORD"),
-            )
-        }
 
-    @staticmethod
-    def raises(token_lists: list[list[Token]]) -> dict[str, list[tuple]]:
-        return {"raises": ([tl for tl in token_lists if isinstance(tl, tuple)])}
+def _identity(value: str) -> str:
+    return value
 
-    @staticmethod
-    def error(tokens: list[Token]) -> tuple[str, str]:
-        return (
-            tokens_to_str(tokens, type_="TYPE"),
-            tokens_to_str(tokens, type_="WORD"),
-        )
 
-    @staticmethod
-    def alias(tokens: list[Token]) -> dict[str, str]:
-        return {"alias": tokens_to_str(tokens, type_="WORD")}
+def tokens_to_str(tokens: list["Token"], type_: str) -> str:
+    return " ".join([token.value for token in tokens if token.type == type_]) or None
+
+
+def lines_to_str(tokens: list["Token"]) -> Optional[str]:
+    """joins the words of line tokens by single spaces"""
+    return " ".join(" ".join(tokens).split()) or None
+
+
+def tokens_to_strs(tokens: list["Token"]) -> dict[str, str]:
+    """joins the token values of each token type in a single pass"""
+    values = {}
+    for token in tokens:
+        values.setdefault(token.type, []).append(token.value)
+    return {type_: " ".join(values_) for type_, values_ in values.items()}
+
+
+def cache_dir() -> str:
+    """directory of the persistent parser cache, set env var 'LARK_DOCSTRING_PARSER_CACHE' to change it"""
+    return os.environ.get("LARK_DOCSTRING_PARSER_CACHE") or os.path.join(
+        os.path.expanduser("~"), ".cache", "lark-docstring-parser"
+    )
+
+
+def cache_file(directory: Optional[str] = None, **options) -> str:
+    """returns the cache file name of a parser keyed by its grammar, options and the lark version"""
+    from lark import __version__ as lark_version
+
+    unhashable = ("transformer", "postlex", "lexer_callbacks", "edit_terminals")
+    key = "".join(f"{k}={v!r};" for k, v in sorted(options.items()) if k not in unhashable) + lark_version
+    directory = directory or cache_dir()
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"lalr-{hashlib.sha256(key.encode()).hexdigest()[:32]}.cache")
+
+
+class ParseCache:
+    """bounded LRU cache of parse results keyed by a hash of the docstring text
+
+    Cached docstrings are copied on the way in and out, so callers cannot corrupt cached entries.
+    Failed parses, i.e. '(None, error)' tuples, are cached as well.
+    """
+
+    def __init__(self, maxsize: int = 1024, maxbytes: Optional[int] = None):
+        """
+        Args:
+            maxsize: maximum number of cached results
+            maxbytes: maximum estimated memory of the cached results, unlimited if None
+        """
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[Tuple[Optional[Docstring], Optional[str]], int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
     @staticmethod
-    def examples(tokens: list[Token]) -> dict[str, str]:
-        return {"examples": tokens_to_str(tokens, type_="WORD")}
-
-
-class DocstringParser(Lark):
-    """parses google style docstrings of module level python functions"""
-
-    google_grammar = r"""
-    ?start:         summary? description? args? (returns | yields)? raises? alias? examples?
-
-    summary:        _line NL
-    description:    _line+ NL
-    args:           "Args"     ":" NL arg+ NL
-    returns:        "Returns"  ":" NL TAB _type NL
-    yields:         "Yields"   ":" NL TAB _type NL
-    raises:         "Raises"   ":" NL error+ NL
-    examples:       "Examples" ":" NL [ ( TAB _line ) | NL ]+ NL
-    alias:          "Alias"    ":" NL TAB _line NL
-
-    arg:            TAB NAME [ SP "(" TYPE ")" ] ":" ( SP | NL ) _line+
-    error:          TAB _type
-    _type:          TYPE ":" ( SP | NL ) _line+
-    _line:          WORD (SP WORD)* NL [ TAB TAB WORD (SP WORD)* NL ]
-
-    NAME:           /[\*|\*\*]*[_a-zA-Z][_a-zA-Z0-9]*/
-    TYPE:           /[_a-zA-Z][_a-zA-Z0-9]*/
-    WORD:           /[a-zA-Z0-9.`,>=()\[\]\/:]/+
-    TAB:            "    " | "  " | "\t"
-    NL:             "\n"
-    SP:             /[ ]/+
+    def key(text: str, namespace: str = "") -> bytes:
+        return hashlib.blake2b(text.encode(), digest_size=16, person=namespace.encode()[:16]).digest()
+
+    def get(self, key: bytes) -> Optional[Tuple[Optional[Docstring], Optional[str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        docstring, error = entry[0]
+        return _copy(docstring), error
+
+    def put(self, key: bytes, result: Tuple[Optional[Docstring], Optional[str]]):
+        docstring, error = result
+        size = _sizeof(docstring) + _sizeof(error)
+        if self.maxbytes is not None and size > self.maxbytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = ((_copy(docstring), error), size)
+            self.bytes += size
+            while len(self._entries) > self.maxsize or (self.maxbytes is not None and self.bytes > self.maxbytes):
+                self.bytes -= self._entries.popitem(last=False)[1][1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+def _copy(docstring: Optional[Docstring]) -> Optional[Docstring]:
+    """copies the mutable parts of a docstring, tuples and strings are shared"""
+    if docstring is None:
+        return None
+    docstring = copy.copy(docstring)
+    if docstring.args is not None:
+        docstring.args = list(docstring.args)
+    if docstring.raises is not None:
+        docstring.raises = list(docstring.raises)
+    return docstring
+
+
+def _sizeof(obj) -> int:
+    """estimated memory of a docstring and its fields"""
+    if isinstance(obj, Docstring):
+        return sys.getsizeof(obj) + sum(_sizeof(value) for value in vars(obj).values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(_sizeof(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+@dataclass(frozen=True)
+class ParseLimits:
+    """worst case guards of 'DocstringParser.parse', None disables a limit
+
+    Inputs over 'max_length' characters or 'max_lines' lines are rejected before parsing. 'max_steps' (terminal
+    matches) and 'timeout' (seconds) bound the polynomial earley parser, the lalr parser runs in linear time and
+    is bounded by the input limits.
     """
 
-    def __init__(self, **kwargs):
-        super().__init__(
-            grammar=self.google_grammar,
-            parser="earley",  # supports rule priority
-            **kwargs,
-        )
+    max_length: Optional[int] = None
+    max_lines: Optional[int] = None
+    max_steps: Optional[int] = None
+    timeout: Optional[float] = None
+
+    def check(self, text: str) -> Optional[str]:
+        """error if the text exceeds the input limits"""
+        if self.max_length is not None and len(text) > self.max_length:
+            return f"docstring exceeds limit of {self.max_length} characters"
+        if self.max_lines is not None and text.count("\n") > self.max_lines:
+            return f"docstring exceeds limit of {self.max_lines} lines"
+        return None
+
+
+class ParseLimitExceeded(Exception):
+    """raised inside the earley parser to abort a parse which exceeds its step or time budget"""
+
+
+class ParseStats:
+    """instruments 'DocstringParser' with per phase timings and counters, subclass it to forward them elsewhere
+
+    Phases are "lex" (lark's lexers run interleaved with the parser and are timed per token or terminal match),
+    "parse" (without lex), "transform" ('TreeToDocstring', part of "parse" with inline_transform) and
+    "post_process" (building the 'Docstring' including '__post_init__'). Only parses which reach lark are recorded,
+    i.e. neither 'ParseCache' hits nor inputs rejected by 'ParseLimits'.
+    """
+
+    PHASES = ("lex", "parse", "transform", "post_process")
+
+    def __init__(self):
+        self.parses = 0
+        self.errors = 0
+        self.tokens = 0  # tokens of the lexer, the earley parser counts successful terminal matches
+        self.seconds = dict.fromkeys(self.PHASES, 0.0)
+        self.sections: Counter[str] = Counter()  # Docstring field -> number of docstrings having it
+        self._lock = threading.Lock()
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.parses if self.parses else 0.0
+
+    def record(self, seconds: dict[str, float], tokens: int, docstring: Optional["Docstring"], error: Optional[str]):
+        """called after each parse with the seconds per phase"""
+        with self._lock:
+            for phase, value in seconds.items():
+                self.seconds[phase] += value
+            self.parses += 1
+            self.tokens += tokens
+            if error is not None:
+                self.errors += 1
+            elif docstring is not None:
+                self.sections.update(name for name, value in vars(docstring).items() if value is not None)
 
-    def parse(self, text: str, **kwargs) -> Tuple[Optional[Docstring], Optional[str]]:
-        try:
-            tree = super().parse(text=text, **kwargs)
-            # print("\n" + tree.pretty())
-            return TreeToDocstring().transform(tree), None
-        except (UnexpectedCharacters, UnexpectedToken) as error:
-            return None, ", ".join(error.args)
+    def __repr__(self) -> str:
+        seconds = ", ".join(f"{phase}={value:.6f}" for phase, value in self.seconds.items())
+        return f"ParseStats(parses={self.parses}, errors={self.errors}, tokens={self.tokens}, {seconds})"
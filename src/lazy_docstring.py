@@ -0,0 +1,170 @@
+"""Lazy, on demand parsing of the sections of google style docstrings
+
+'parse_lazy' only scans the text for section headers. A section is parsed when one of its 'Docstring' attributes
+is accessed for the first time, the result is cached on the object.
+"""
+
+import re
+from typing import Optional
+
+from src.fast_docstring_parser import SECTIONS, FastDocstringParser
+from src.lark_docstring_parser import Docstring
+
+HEADER = re.compile(r"^(?:Args|Returns|Yields|Raises|Alias|Examples):$", re.MULTILINE)
+FIELDS = ("summary", "description", "args", "returns", "yields", "raises", "alias", "examples")
+
+# segment which holds a field, the summary and description are part of the text before the first header
+SEGMENTS = {"summary": "", "description": "", **{header[:-1].lower(): header for header in SECTIONS}}
+
+# header -> fields of the section
+SECTION_FIELDS: dict[str, list[str]] = {}
+for _name, _header in SEGMENTS.items():
+    SECTION_FIELDS.setdefault(_header, []).append(_name)
+
+_default_parser: Optional[FastDocstringParser] = None
+
+
+def default_parser() -> FastDocstringParser:
+    global _default_parser
+    if _default_parser is None:
+        _default_parser = FastDocstringParser()
+    return _default_parser
+
+
+def section_value(section, name: str):
+    """field of a section's parse result, which may also be a dict of fields, e.g. of a lark grammar with '?start'"""
+    return section.get(name) if isinstance(section, dict) else getattr(section, name)
+
+
+def section_spans(text: str) -> Optional[list[tuple[str, int, int]]]:
+    """finds the sections of the text, returns None if the headers are not in the order of 'SECTIONS'
+
+    Returns:
+        '(header, start, end)' of each section, header "" for the text before the first header
+    """
+    spans = []
+    header, start, order = "", 0, 0
+    for match in HEADER.finditer(text):
+        if SECTIONS[match.group()] <= order:
+            return None
+        spans.append((header, start, match.start()))
+        header, start, order = match.group(), match.start(), SECTIONS[match.group()]
+    spans.append((header, start, len(text)))
+    return spans
+
+
+def fills_section_only(section, header: str) -> bool:
+    """whether a section parsed on its own fills the fields of its header only, a malformed section may be read as
+    another one, e.g. a 'Raises:' block without indentation as description"""
+    names = set(SECTION_FIELDS[header])
+    return all(section_value(section, name) is None for name in SEGMENTS if name not in names)
+
+
+def sections_separated(text: str, spans: list[tuple[str, int, int]]) -> bool:
+    """whether all sections but the last end with a single blank line and no trailing spaces
+
+    'DocstringParser.parse' strips a text and terminates it with a blank line, a section parsed on its own is only
+    parsed like in the whole text if it is already in this form.
+    """
+    return all(_terminated(text[start:end]) for _, start, end in spans[:-1] if start != end)
+
+
+def _terminated(section: str) -> bool:
+    return section.endswith("\n\n") and section == section.rstrip() + "\n\n"
+
+
+def split_sections(text: str) -> Optional[dict[str, str]]:
+    """splits the text at its section headers, returns None if the headers are not in the order of 'SECTIONS'
+
+    Returns:
+        header ("" for the text before the first header) -> text of the section including its header
+    """
+    spans = section_spans(text)
+    if spans is None:
+        return None
+    return {header: text[start:end] for header, start, end in spans}
+
+
+class LazyDocstring:
+    """'Docstring' whose sections are parsed on first access
+
+    Sections which fail to parse read as None, their errors are collected in 'errors'. Texts whose sections may parse
+    differently on their own, i.e. out of order, not separated by single blank lines or read as another section, are
+    parsed as a whole like an eager parse.
+    """
+
+    summary = property(lambda self: self._get("summary"))
+    description = property(lambda self: self._get("description"))
+    args = property(lambda self: self._get("args"))
+    returns = property(lambda self: self._get("returns"))
+    yields = property(lambda self: self._get("yields"))
+    raises = property(lambda self: self._get("raises"))
+    alias = property(lambda self: self._get("alias"))
+    examples = property(lambda self: self._get("examples"))
+
+    def __init__(self, text: str, parser=None):
+        """
+        Args:
+            text: docstring
+            parser: object with a 'parse(text)' method returning '(docstring, error)', used per section
+        """
+        self.parser = parser or default_parser()
+        self.errors: dict[str, str] = {}  # header -> error
+        self._text = text
+        self._whole = False  # all fields are taken from a parse of the whole text
+        self._parsed: dict[str, Optional[Docstring]] = {}  # header -> docstring of the section
+        spans = section_spans(text)
+        if spans is None or not sections_separated(text, spans):  # the sections may parse differently on their own
+            self._parse_whole()
+        else:
+            self._segments = {header: text[start:end] for header, start, end in spans}
+
+    def _parse_whole(self) -> Optional[Docstring]:
+        """parses the whole text like an eager parse, e.g. sections out of order fail like it"""
+        self._whole = True
+        self._segments = {"": self._text}
+        self._parsed.clear()
+        self.errors.clear()
+        return self._parse("")
+
+    def _parse(self, header: str) -> Optional[Docstring]:
+        if header not in self._parsed:
+            docstring, error = self.parser.parse(text=self._segments[header])
+            if error is None and not self._whole and not fills_section_only(docstring, header):
+                return self._parse_whole()  # the section is read as another one
+            if error is not None:
+                self.errors[header] = error
+            self._parsed[header] = docstring
+        return self._parsed[header]
+
+    def _get(self, name: str):
+        header = "" if self._whole else SEGMENTS[name]
+        if header not in self._segments:
+            return None
+        docstring = self._parse(header)
+        return None if docstring is None else section_value(docstring, name)
+
+    @property
+    def parsed_sections(self) -> list[str]:
+        """headers of the sections parsed so far, "" for summary and description"""
+        return list(self._parsed)
+
+    def to_docstring(self) -> Docstring:
+        """parses all remaining sections"""
+        for header in list(self._segments):
+            if self._whole:  # a section was read as another one
+                break
+            self._parse(header)
+        return Docstring(**{name: getattr(self, name) for name in FIELDS})
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Docstring, LazyDocstring)):
+            return all(getattr(self, name) == getattr(other, name) for name in FIELDS)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyDocstring(sections={list(self._segments)!r}, parsed={self.parsed_sections!r})"
+
+
+def parse_lazy(text: str, parser=None) -> LazyDocstring:
+    return LazyDocstring(text, parser=parser)
@@ -0,0 +1,136 @@
+"""Parsing of the docstrings of live functions, classes and modules with a cache per object
+
+Results are cached in a weak keyed dictionary, an entry lives as long as its object and is parsed again when
+'__doc__' of the object is changed. Bound methods are cached by their function.
+"""
+import inspect
+import threading
+import types
+import weakref
+from typing import Callable, Optional, Tuple
+
+from src.lark_docstring_parser import Docstring, _copy
+from src.lazy_docstring import default_parser
+
+Result = Tuple[Optional[Docstring], Optional[str]]
+
+
+def normalize_docstring(text: str) -> str:
+    """removes the indentation of the docstring, which ends with a blank line like the docstrings in the tests"""
+    return inspect.cleandoc(text) + "\n\n"
+
+
+class ObjectDocstrings:
+    """cache of the parsed docstrings of objects"""
+
+    def __init__(self, parser=None):
+        """
+        Args:
+            parser: object with a 'parse(text)' method returning '(docstring, error)', defaults to the parser of
+                'lazy_docstring'
+        """
+        self.parser = parser or default_parser()
+        self.hits = 0
+        self.misses = 0
+        self._entries: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()  # object -> (__doc__, result)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def parse(self, obj) -> Result:
+        """parses the docstring of the object, '(None, error)' if it has none
+
+        Cached docstrings are copied like in 'ParseCache', so callers cannot corrupt cached entries.
+        """
+        obj = getattr(obj, "__func__", obj)  # bound and class methods
+        text = getattr(obj, "__doc__", None)
+        try:
+            entry = self._entries.get(obj)
+            cacheable = True
+        except TypeError:  # cannot be weakly referenced, e.g. instances of builtin types
+            entry, cacheable = None, False
+        if entry is not None and entry[0] is text:
+            self.hits += 1
+            docstring, error = entry[1]
+            return _copy(docstring), error
+        self.misses += 1
+        if not isinstance(text, str):
+            result = None, f"{_name(obj)} has no docstring"
+        else:
+            result = self.parser.parse(text=normalize_docstring(text))
+        if cacheable:
+            with self._lock:
+                self._entries[obj] = (text, (_copy(result[0]), result[1]))
+        return result
+
+    def register(self, obj: Callable) -> Callable:
+        """decorator which parses the docstring of a function or class ahead of time"""
+        self.parse(obj)
+        return obj
+
+    def register_module(self, module: types.ModuleType) -> int:
+        """parses the docstrings of the functions, classes and methods defined in the module ahead of time
+
+        Returns:
+            number of parsed docstrings
+        """
+        objects = [module]
+        for obj in vars(module).values():
+            if getattr(obj, "__module__", None) != module.__name__:
+                continue  # imported
+            if inspect.isfunction(obj):
+                objects.append(obj)
+            elif inspect.isclass(obj):
+                objects.append(obj)
+                objects.extend(_methods(obj))
+        count = 0
+        for obj in objects:
+            if isinstance(obj.__doc__, str):
+                self.parse(obj)
+                count += 1
+        return count
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _methods(cls: type) -> list[Callable]:
+    methods = []
+    for value in vars(cls).values():
+        value = getattr(value, "__func__", value)  # static and class methods
+        if isinstance(value, property):
+            value = value.fget
+        if inspect.isfunction(value):
+            methods.append(value)
+    return methods
+
+
+def _name(obj) -> str:
+    return getattr(obj, "__qualname__", None) or getattr(obj, "__name__", None) or type(obj).__name__
+
+
+_default_docstrings: Optional[ObjectDocstrings] = None
+
+
+def default_docstrings() -> ObjectDocstrings:
+    global _default_docstrings
+    if _default_docstrings is None:
+        _default_docstrings = ObjectDocstrings()
+    return _default_docstrings
+
+
+def parse_object(obj) -> Result:
+    """parses the docstring of a function, method, class or module, cached per object"""
+    return default_docstrings().parse(obj)
+
+
+def register(obj: Callable) -> Callable:
+    """decorator which parses the docstring ahead of time, see 'ObjectDocstrings.register'"""
+    return default_docstrings().register(obj)
+
+
+def register_module(module: types.ModuleType) -> int:
+    """parses the docstrings of a module ahead of time, see 'ObjectDocstrings.register_module'"""
+    return default_docstrings().register_module(module)
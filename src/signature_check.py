@@ -0,0 +1,272 @@
+"""Consistency check of function signatures and their google style docstrings without importing the modules
+
+Signatures are read with 'ast', like the docstrings in 'docstring_scanner'. Issues per function:
+
+    parse-error      the docstring cannot be parsed
+    missing-arg      parameter not in 'Args:', checked if the docstring has an 'Args:' section
+    unknown-arg      documented argument which is not a parameter
+    arg-type         documented type which does not occur in the annotation of the parameter
+    missing-returns  value returned but neither 'Returns:' nor 'Yields:' documented
+    extra-returns    'Returns:' documented but no value returned
+    returns-type     documented type which does not occur in the return annotation
+    missing-yields   generator without 'Yields:'
+    extra-yields     'Yields:' documented but nothing yielded
+    missing-raises   exception raised by the function itself but not in 'Raises:'
+
+The missing-* checks of returns, yields and raises apply to docstrings with at least one section only, a one line
+docstring is not expected to document them. Functions whose body is a stub ('pass', '...' or raising
+'NotImplementedError') are not checked for extra returns and yields.
+"""
+
+import ast
+import functools
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from src.docstring_scanner import (
+    function_docstring,
+    in_worker,
+    init_worker,
+    iter_functions,
+    iter_source_files,
+    ordered_map,
+)
+from src.fast_docstring_parser import FastDocstringParser
+from src.lark_docstring_parser import Docstring
+
+IDENTIFIER = re.compile(r"[_a-zA-Z][_a-zA-Z0-9]*")
+
+# '(qualname, lineno)' -> '(docstring, error)' of a file parsed before, e.g. by a 'DocstringIndex'
+Cached = dict[Tuple[str, int], Tuple[Optional[Docstring], Optional[str]]]
+
+
+class Issue(NamedTuple):
+    module: str
+    qualname: Optional[str]  # None if the module could not be read
+    lineno: int
+    code: str
+    message: str
+
+
+class Parameter(NamedTuple):
+    name: str  # with '*' or '**' for variadic parameters
+    annotation: Optional[str]
+
+
+def signature(function: ast.AST, method: bool = False) -> list[Parameter]:
+    """parameters of a function as they are documented, i.e. without 'self' or 'cls' of methods"""
+    args = function.args
+    positional = [*args.posonlyargs, *args.args]
+    static = any(isinstance(d, ast.Name) and d.id == "staticmethod" for d in function.decorator_list)
+    if method and not static:
+        positional = positional[1:]
+    parameters = [Parameter(arg.arg, _unparse(arg.annotation)) for arg in positional]
+    if args.vararg is not None:
+        parameters.append(Parameter("*" + args.vararg.arg, _unparse(args.vararg.annotation)))
+    parameters += [Parameter(arg.arg, _unparse(arg.annotation)) for arg in args.kwonlyargs]
+    if args.kwarg is not None:
+        parameters.append(Parameter("**" + args.kwarg.arg, _unparse(args.kwarg.annotation)))
+    return parameters
+
+
+def _unparse(annotation: Optional[ast.AST]) -> Optional[str]:
+    return None if annotation is None else ast.unparse(annotation)
+
+
+def _matches(type_: str, annotation: Optional[str]) -> bool:
+    """whether the documented type names the annotation, e.g. 'list' for 'list[str]' or 'str' for 'Optional[str]'"""
+    if annotation is None:
+        return True
+    try:
+        return type_ in _type_names(ast.parse(annotation, mode="eval").body)
+    except SyntaxError:
+        return type_ in IDENTIFIER.findall(annotation)
+
+
+def _type_names(node: ast.AST) -> set[str]:
+    """names of an annotation and of the members of an 'Optional' or 'Union' annotation"""
+    if isinstance(node, ast.Name):
+        return {node.id}
+    if isinstance(node, ast.Attribute):
+        return {node.attr}
+    if isinstance(node, ast.Constant):  # None or a forward reference
+        return {"None"} if node.value is None else _forward_reference_names(node.value)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        return _type_names(node.left) | _type_names(node.right)
+    if isinstance(node, ast.Subscript):
+        names = _type_names(node.value)
+        if names & {"Optional", "Union"}:
+            members = node.slice.elts if isinstance(node.slice, ast.Tuple) else [node.slice]
+            return set().union(*(_type_names(member) for member in members))
+        return names
+    return set(IDENTIFIER.findall(ast.unparse(node)))
+
+
+def _forward_reference_names(value) -> set[str]:
+    try:
+        return _type_names(ast.parse(value, mode="eval").body) if isinstance(value, str) else set()
+    except SyntaxError:
+        return set()
+
+
+class _Body(NamedTuple):
+    returns_value: bool
+    yields: bool
+    raised: list[str]  # names of the raised exceptions
+    stub: bool
+
+
+def _body(function: ast.AST) -> _Body:
+    """return, yield and raise statements of the function itself, nested functions and classes are skipped"""
+    returns_value = yields = False
+    raised = []  # (lineno, name)
+    nodes = list(ast.iter_child_nodes(function))
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            continue
+        if isinstance(node, ast.Return) and node.value is not None:
+            returns_value |= not (isinstance(node.value, ast.Constant) and node.value.value is None)
+        elif isinstance(node, (ast.Yield, ast.YieldFrom)):
+            yields = True
+        elif isinstance(node, ast.Raise) and node.exc is not None:
+            exc = node.exc.func if isinstance(node.exc, ast.Call) else node.exc
+            if isinstance(exc, ast.Name):
+                raised.append((node.lineno, exc.id))
+        nodes.extend(ast.iter_child_nodes(node))
+    statements = function.body[1:] if ast.get_docstring(function) is not None else function.body
+    stub = all(_is_stub(statement) for statement in statements)
+    return _Body(returns_value, yields, [name for _, name in sorted(raised)], stub)
+
+
+def _is_stub(statement: ast.stmt) -> bool:
+    if isinstance(statement, ast.Pass):
+        return True
+    if isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant):
+        return statement.value.value is Ellipsis
+    if isinstance(statement, ast.Raise) and statement.exc is not None:
+        exc = statement.exc.func if isinstance(statement.exc, ast.Call) else statement.exc
+        return isinstance(exc, ast.Name) and exc.id == "NotImplementedError"
+    return False
+
+
+def check_function(function: ast.AST, docstring: Docstring, method: bool = False) -> list[Tuple[str, str]]:
+    """
+    Returns:
+        '(code, message)' of the issues of the function
+    """
+    issues = []
+    parameters = signature(function, method)
+    names = {parameter.name.lstrip("*"): parameter for parameter in parameters}
+    documented = set()
+    for name, type_, _ in docstring.args or []:
+        parameter = names.get(name.lstrip("*"))
+        documented.add(name.lstrip("*"))
+        if parameter is None:
+            issues.append(("unknown-arg", f"argument '{name}' is not a parameter"))
+        elif type_ is not None and not _matches(type_, parameter.annotation):
+            issues.append(
+                ("arg-type", f"type '{type_}' of '{name}' does not match annotation '{parameter.annotation}'")
+            )
+    if docstring.args is not None:
+        for name, parameter in names.items():
+            if name not in documented:
+                issues.append(("missing-arg", f"parameter '{parameter.name}' is not documented"))
+
+    body = _body(function)
+    structured = any(
+        value is not None for value in (docstring.args, docstring.returns, docstring.yields, docstring.raises)
+    )
+    annotation = _unparse(function.returns)
+    if docstring.returns is not None:
+        if not body.returns_value and not body.stub:
+            issues.append(("extra-returns", "'Returns:' documented but no value returned"))
+        if not _matches(docstring.returns[0], annotation):
+            issues.append(("returns-type", f"type '{docstring.returns[0]}' does not match annotation '{annotation}'"))
+    elif structured and body.returns_value and docstring.yields is None:
+        issues.append(("missing-returns", "value returned but 'Returns:' is not documented"))
+    if docstring.yields is not None:
+        if not body.yields and not body.stub:
+            issues.append(("extra-yields", "'Yields:' documented but nothing yielded"))
+    elif structured and body.yields:
+        issues.append(("missing-yields", "generator but 'Yields:' is not documented"))
+    if structured:
+        documented_raises = {name for name, _ in docstring.raises or []}
+        for name in dict.fromkeys(body.raised):
+            if name not in documented_raises and name != "NotImplementedError":
+                issues.append(("missing-raises", f"'{name}' is raised but not documented"))
+    return issues
+
+
+def check_file(path: str, module: str, parser, cached: Optional[Cached] = None) -> list[Issue]:
+    """checks the documented functions of a source file
+
+    Args:
+        path: python source file
+        module: module name of the file
+        parser: object with a 'parse(text)' method returning '(docstring, error)'
+        cached: parse results of the file, docstrings not found in there are parsed
+    """
+    try:
+        with open(path, "rb") as file:
+            tree = ast.parse(file.read(), filename=path)
+    except (OSError, SyntaxError, ValueError) as error:
+        lineno = getattr(error, "lineno", None) or 0
+        return [Issue(module, None, lineno, "parse-error", f"{type(error).__name__}: {error}")]
+    issues = []
+    for qualname, function, method in iter_functions(tree):
+        text = function_docstring(function)
+        if text is None:
+            continue
+        result = cached.get((qualname, function.lineno)) if cached is not None else None
+        docstring, error = result if result is not None else parser.parse(text=text)
+        if error is not None:
+            issues.append(Issue(module, qualname, function.lineno, "parse-error", error))
+            continue
+        for code, message in check_function(function, docstring, method):
+            issues.append(Issue(module, qualname, function.lineno, code, message))
+    return issues
+
+
+def check_tree(
+    root: str,
+    workers: int = 1,
+    parser_factory: Callable = FastDocstringParser,
+    index=None,
+) -> Iterator[Issue]:
+    """streams the issues of all python files below root
+
+    Args:
+        root: package directory, directory of packages or single python file
+        workers: number of worker processes, files are checked in process if 1
+        parser_factory: builds the parser, called once per process
+        index: 'DocstringIndex' built with the same parser factory, it is updated first and its parse results
+            are reused
+
+    Returns:
+        issues in the order of 'iter_source_files'
+    """
+    files: Iterable[Tuple[str, str, Optional[Cached]]]
+    if index is None:
+        files = ((path, module, None) for path, module in iter_source_files(root))
+    else:
+        index.update(root, workers=workers)
+        files = ((path, module, _cached(index, path)) for path, module in iter_source_files(root))
+    if workers <= 1:
+        parser = parser_factory()
+        for path, module, cached in files:
+            yield from check_file(path, module, parser, cached)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(parser_factory,)) as pool:
+        for issues in ordered_map(pool, functools.partial(in_worker, _check_file), files, window=4 * workers):
+            yield from issues
+
+
+def _cached(index, path: str) -> Cached:
+    return {(r.qualname, r.lineno): (r.docstring, r.error) for r in index.records(path=path)}
+
+
+def _check_file(file: Tuple[str, str, Optional[Cached]], parser) -> list[Issue]:
+    path, module, cached = file
+    return check_file(path, module, parser, cached)
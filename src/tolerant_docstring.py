@@ -0,0 +1,94 @@
+"""Error tolerant parsing of google style docstrings, which recovers at the next section header
+
+'parse_tolerant' splits the text at its section headers and parses each section once. A section which fails
+leaves its fields None and is reported with its location, all other sections are kept. No trimmed variants of the
+text are tried, so a malformed docstring costs about one parse. Sections which do not end with a single blank line
+(see 'sections_separated') may parse differently on their own, such a text is parsed as a whole first and its
+sections are parsed again only if that fails.
+"""
+import re
+from typing import NamedTuple, Optional, Tuple
+
+from src.lark_docstring_parser import Docstring
+from src.lazy_docstring import (
+    HEADER,
+    SECTION_FIELDS,
+    SECTIONS,
+    default_parser,
+    fills_section_only,
+    section_value,
+    sections_separated,
+)
+
+# location in the error messages of lark, "at line 3, column 5" (LALR) or "at line 3 col 5" (lexer)
+LOCATION = re.compile(r"at line (\d+),? col(?:umn)? (\d+)")
+
+
+class SectionError(NamedTuple):
+    header: str  # "" for summary and description
+    line: int  # in the whole text, starting at 1
+    column: Optional[int]  # None if the parser reports no location
+    message: str
+
+
+def parse_tolerant(text: str, parser=None) -> Tuple[Docstring, list[SectionError]]:
+    """parses the sections of the text which are well formed
+
+    Args:
+        text: docstring
+        parser: object with a 'parse(text)' method returning '(docstring, error)', defaults to the parser of
+            'lazy_docstring'
+
+    Returns:
+        docstring with the fields of the failed sections None, and the errors in text order, the docstring
+        equals a full parse if there are no errors
+    """
+    parser = parser or default_parser()
+    spans = []
+    header, start = "", 0
+    for match in HEADER.finditer(text):
+        spans.append((header, start, match.start()))
+        header, start = match.group(), match.start()
+    spans.append((header, start, len(text)))
+
+    failed = None  # error of the whole text
+    if len(spans) == 1 or not sections_separated(text, spans):  # a section may not be parsable on its own
+        docstring, error = parser.parse(text=text)
+        if error is None:
+            return docstring, []
+        failed = _section_error(text, "", 0, error)
+        if len(spans) == 1:
+            return Docstring(), [failed]
+
+    fields, errors = {}, []
+    order = 0  # position of the last parsed section in 'SECTIONS'
+    for header, start, end in spans:
+        if start == end:  # no text before the first header
+            continue
+        if header and SECTIONS[header] <= order:
+            errors.append(_section_error(text, header, start, f"section '{header}' is duplicate or out of order"))
+            continue
+        order = SECTIONS.get(header, 0)
+        section, error = parser.parse(text=text[start:end])
+        if error is None and not fills_section_only(section, header):
+            error = f"section '{header or 'summary'}' is read as another section"
+        if error is not None:
+            errors.append(_section_error(text, header, start, error))
+            continue
+        for name in SECTION_FIELDS[header]:
+            fields[name] = section_value(section, name)
+    if failed is not None and not errors:  # the sections parse on their own but not as a whole
+        header = next(h for h, start, _ in reversed(spans) if text.count("\n", 0, start) < failed.line)
+        errors.append(failed._replace(header=header))
+    return Docstring(**fields), errors
+
+
+def _section_error(text: str, header: str, start: int, message: str) -> SectionError:
+    """error of the section starting at 'start', its location is translated to the whole text"""
+    offset = text.count("\n", 0, start)
+    match = LOCATION.search(message)
+    if match is None:
+        return SectionError(header, offset + 1, None, message)
+    line, column = int(match.group(1)) + offset, int(match.group(2))
+    message = message[: match.start()] + f"at line {line}, column {column}" + message[match.end() :]
+    return SectionError(header, line, column, message)
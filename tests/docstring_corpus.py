@@ -0,0 +1,138 @@
+"""Seeded generator of synthetic google and numpy style docstrings for benchmarks
+
+Words are taken from the character set of the lark grammars, indentation is 4 spaces.
+"""
+import random
+
+WORDS = (
+    "the a of to and in is for with value values returns list dict path query key keys item items "
+    "default optional number string result results `arg1` `None` (see below) [JMESpath](https://jmespath.org) "
+    "e.g. i.e. >= 0, 1.5 True."
+).split()
+TYPES = ("str", "int", "bool", "float", "list", "dict", "Path", "bytes", "Callable")
+ERRORS = ("ValueError", "TypeError", "KeyError", "AttributeError", "RuntimeError", "OSError")
+
+# number of arguments and probability of continuation lines per size
+SIZES = {"small": (1, 0.0), "medium": (5, 0.3), "large": (30, 0.5)}
+
+
+# numpy style sample of 'test_numpy_docstring_parser', which cannot be imported without numpydoc
+NUMPY_SAMPLE = """
+Summary line.
+
+Extended description of function.
+
+Parameters
+----------
+arg1 : int, default: 5
+    Description of arg1
+arg2 : str
+    Description of arg2
+arg3 : str
+    The [JMESpath](https://jmespath.org) query.
+
+Returns
+-------
+bool
+    Description of return value
+
+Raises
+------
+AttributeError
+    The ``Raises`` section is a list of all exceptions
+    that are relevant to the interface.
+ValueError
+    If `arg2` is equal to `arg1`.
+
+Examples
+--------
+Examples should be written in doctest format, and should illustrate how
+to use the function.
+
+>>> a=1
+>>> b=2
+>>> func(a,b)
+True
+
+Notes
+-----
+blabla
+
+"""
+
+
+def sentence(rng: random.Random, low: int = 3, high: int = 10) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def continuation(rng: random.Random, probability: float, indent: str) -> list[str]:
+    """up to three continuation lines"""
+    if rng.random() >= probability:
+        return []
+    return [indent + sentence(rng) for _ in range(rng.randint(1, 3))]
+
+
+def google_docstring(rng: random.Random, size: str) -> str:
+    count, probability = SIZES[size]
+    lines = [sentence(rng).capitalize() + ".", ""]
+    if size != "small" or rng.random() < 0.5:
+        lines += [sentence(rng, 5, 12) for _ in range(rng.randint(1, 3))] + [""]
+    lines.append("Args:")
+    names = [f"arg{index}" for index in range(count)]
+    if count > 2:
+        names[-2:] = ["*args", "**kwargs"]
+    for name in names:
+        type_ = f" ({rng.choice(TYPES)})" if rng.random() < 0.6 and not name.startswith("*") else ""
+        lines.append(f"    {name}{type_}: {sentence(rng)}")
+        lines += continuation(rng, probability, " " * 8)
+    lines.append("")
+    if rng.random() < 0.8:
+        lines += [rng.choice(("Returns:", "Yields:")), f"    {rng.choice(TYPES)}: {sentence(rng)}", ""]
+    if rng.random() < 0.6:
+        lines.append("Raises:")
+        for error in rng.sample(ERRORS, rng.randint(1, 3)):
+            lines.append(f"    {error}: {sentence(rng)}")
+            lines += continuation(rng, probability, " " * 8)
+        lines.append("")
+    if rng.random() < 0.3:
+        lines += ["Alias:", f"    {sentence(rng, 2, 4)}", ""]
+    if rng.random() < 0.5:
+        lines += ["Examples:", f"    {sentence(rng)}", "", "    >>> a=1", "    >>> func(a)", "    True", ""]
+    return "\n".join(lines) + "\n"
+
+
+def numpy_docstring(rng: random.Random, size: str) -> str:
+    count, probability = SIZES[size]
+    lines = [sentence(rng).capitalize() + ".", ""]
+    if size != "small" or rng.random() < 0.5:
+        lines += [sentence(rng, 5, 12) for _ in range(rng.randint(1, 3))] + [""]
+    lines += ["Parameters", "----------"]
+    for index in range(count):
+        lines += [f"arg{index} : {rng.choice(TYPES)}", f"    {sentence(rng)}"]
+        lines += continuation(rng, probability, " " * 4)
+    lines.append("")
+    if rng.random() < 0.8:
+        title = rng.choice(("Returns", "Yields"))
+        lines += [title, "-" * len(title), rng.choice(TYPES), f"    {sentence(rng)}", ""]
+    if rng.random() < 0.6:
+        lines += ["Raises", "------"]
+        for error in rng.sample(ERRORS, rng.randint(1, 3)):
+            lines += [error, f"    {sentence(rng)}"]
+            lines += continuation(rng, probability, " " * 4)
+        lines.append("")
+    if rng.random() < 0.5:
+        lines += ["Examples", "--------", sentence(rng), "", ">>> a=1", ">>> func(a)", "True", ""]
+    return "\n".join(lines) + "\n"
+
+
+def generate_corpus(style: str, size: str, count: int = 20, seed: int = 0) -> list[str]:
+    """
+    Args:
+        style: "google" or "numpy"
+        size: "small", "medium" or "large", see 'SIZES'
+        count: number of docstrings
+        seed: same seed, same corpus
+    """
+    rng = random.Random(f"{style}-{size}-{seed}")
+    generate = {"google": google_docstring, "numpy": numpy_docstring}[style]
+    return [generate(rng, size) for _ in range(count)]
@@ -0,0 +1,55 @@
+import pytest
+
+from src.alias_index import AliasEntry, AliasIndex, update_alias_index, write_alias_file
+
+
+def function_source(name: str, alias: str) -> str:
+    return f'def {name}():\n    """Summary line.\n\n    Alias:\n        {alias}\n    """\n'
+
+
+@pytest.fixture
+def package(tmp_path):
+    root = tmp_path / "package"
+    root.mkdir()
+    (root / "one.py").write_text(function_source("one", "First Function") + function_source("two", "Second"))
+    (root / "two.py").write_text(function_source("three", "second") + 'def four():\n    """Summary line."""\n')
+    return root
+
+
+def test_update_alias_index(tmp_path, package):
+    alias_path = str(tmp_path / "aliases.idx")
+
+    stats, duplicates = update_alias_index(str(package), alias_path)
+    assert stats.parsed == 2
+    assert duplicates == {"second": [AliasEntry("one", "two", 7), AliasEntry("two", "three", 1)]}
+
+    with AliasIndex(alias_path) as index:
+        assert len(index) == 2
+        assert index.lookup("first function") == [AliasEntry("one", "one", 1)]
+        assert index.get("FirstFunction") == AliasEntry("one", "one", 1)
+        assert index.get("second") is None  # ambiguous
+        assert index.lookup("unknown") == []
+
+    (package / "two.py").write_text(function_source("three", "third"))
+    stats, duplicates = update_alias_index(str(package), alias_path)
+    assert (stats.parsed, stats.unchanged) == (1, 1)
+    assert duplicates == {}
+
+    with AliasIndex(alias_path) as index:
+        assert index.get("second") == AliasEntry("one", "two", 7)
+        assert index.get("third") == AliasEntry("two", "three", 1)
+
+
+def test_many_aliases(tmp_path):
+    aliases = {f"alias{index}": [AliasEntry("module", f"function{index}", index)] for index in range(1000)}
+    write_alias_file(aliases, str(tmp_path / "aliases.idx"))
+
+    with AliasIndex(str(tmp_path / "aliases.idx")) as index:
+        assert all(index.lookup(alias) == entries for alias, entries in aliases.items())
+        assert index.lookup("alias1000") == []
+
+
+def test_no_alias_index(tmp_path):
+    (tmp_path / "aliases.idx").write_bytes(b"something else")
+    with pytest.raises(ValueError):
+        AliasIndex(str(tmp_path / "aliases.idx"))
@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import pytest
+
+from docstring_corpus import generate_corpus
+from src.async_docstring_parser import AsyncDocstringParser
+from src.lark_docstring_parser import DocstringParser
+import test_lark_docstring_parser
+from test_lark_docstring_parser import assert_doctsring
+
+TEXT = test_lark_docstring_parser.test_parse_google_style_lalr.__doc__
+
+
+@pytest.fixture(scope="module")
+def async_parser():
+    parser = AsyncDocstringParser(workers=2, parser="lalr")
+    yield parser
+    parser.close()
+
+
+def test_parse(async_parser):
+    docstring, error = asyncio.run(async_parser.parse(TEXT))
+
+    assert error is None
+    assert_doctsring(docstring)
+
+
+def test_parse_many(async_parser):
+    texts = generate_corpus("google", "medium", count=40)
+    texts[5] = texts[3]  # duplicate
+    texts[7] = "Summary line.\n\nArgs:\n    arg1 Description of arg1\n"  # syntax error
+
+    results = asyncio.run(async_parser.parse_many(texts))
+
+    parser = DocstringParser(parser="lalr")
+    assert results == [parser.parse(text=text) for text in texts]
+    assert results[7][0] is None
+
+
+def test_identical_requests_are_merged(async_parser):
+    submitted = []
+    submit = async_parser._submit
+
+    async def counting_submit(function, argument):
+        submitted.append(argument)
+        return await submit(function, argument)
+
+    async def main():
+        async_parser._submit = counting_submit
+        try:
+            return await asyncio.gather(*(async_parser.parse(TEXT) for _ in range(10)))
+        finally:
+            del async_parser._submit
+
+    results = asyncio.run(main())
+
+    assert submitted == [TEXT]
+    assert len(results) == 10 and all(result == results[0] for result in results)
+    assert async_parser._in_flight == {}
+
+
+def test_cancellation():
+    slow = "Summary " + "word " * 3000 + "\n\n!"  # earley parses this for a while and fails at the end
+
+    async def main(parser: AsyncDocstringParser):
+        running = asyncio.ensure_future(parser.parse(slow))
+        queued = asyncio.ensure_future(parser.parse(TEXT))  # waits for the only slot
+        shared = [asyncio.ensure_future(parser.parse(slow)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        shared[0].cancel()  # the parse is still awaited by 'running' and 'shared[1]'
+        results = await asyncio.gather(running, queued, *shared, return_exceptions=True)
+        return results, dict(parser._in_flight)
+
+    with AsyncDocstringParser(workers=1, max_concurrency=1) as parser:
+        (running, queued, cancelled, shared), in_flight = asyncio.run(main(parser))
+
+    assert isinstance(queued, asyncio.CancelledError)
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert running == shared and running[0] is None
+    assert in_flight == {}
+
+
+def test_event_loops():
+    """the parser is used by one loop after the other, with more chunks than parses in flight"""
+    texts = generate_corpus("google", "small", count=8)
+    parser = DocstringParser(parser="lalr")
+
+    with AsyncDocstringParser(workers=1, max_concurrency=1, chunksize=2, parser="lalr") as async_parser:
+        for _ in range(2):
+            assert asyncio.run(async_parser.parse_many(texts)) == [parser.parse(text=text) for text in texts]
+            assert asyncio.run(async_parser.parse(texts[0])) == parser.parse(text=texts[0])
+
+
+def test_event_loop_stays_responsive():
+    texts = generate_corpus("google", "large", count=40)
+    gaps = []
+
+    async def ticker(done: asyncio.Event):
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    async def main(parser: AsyncDocstringParser):
+        done = asyncio.Event()
+        tick = asyncio.ensure_future(ticker(done))
+        results = await parser.parse_many(texts)
+        done.set()
+        await tick
+        return results
+
+    with AsyncDocstringParser(workers=2, chunksize=4) as parser:
+        results = asyncio.run(main(parser))
+
+    assert len(results) == len(texts)
+    assert len(gaps) > 10
+    assert max(gaps) < 0.1
@@ -0,0 +1,137 @@
+"""Comparative benchmarks of all docstring parser backends on synthetic corpora
+
+Besides the pytest-benchmark timings each benchmark records throughput, latency percentiles, peak memory and
+the number of failed parses in 'extra_info'. Regressions are flagged against a saved baseline:
+
+    pytest tests/test_benchmark_suite.py --benchmark-autosave
+    pytest tests/test_benchmark_suite.py --benchmark-compare --benchmark-compare-fail=median:20%
+"""
+
+import statistics
+import time
+import tracemalloc
+from typing import Callable
+
+import pytest
+
+from docstring_corpus import generate_corpus
+
+SEED = 0
+CORPUS_SIZE = 20
+CORPORA = [(style, size) for style in ("google", "numpy") for size in ("small", "medium", "large")]
+
+
+def lark_backend(**options) -> Callable[[str], bool]:
+    from src.lark_docstring_parser import DocstringParser
+
+    parser = DocstringParser(**options)
+    return lambda text: parser.parse(text=text)[0] is not None
+
+
+def fast_backend(style: str) -> Callable[[str], bool]:
+    from src.fast_docstring_parser import FastDocstringParser
+
+    parser = FastDocstringParser()
+    return lambda text: parser.parse(text=text)[0] is not None
+
+
+def docstring_parser_backend(style: str) -> Callable[[str], bool]:
+    from docstring_parser import parse, Style
+
+    style_ = {"google": Style.google, "numpy": Style.numpydoc}[style]
+    return lambda text: parse(text, style=style_) is not None
+
+
+def numpydoc_backend(style: str) -> Callable[[str], bool]:
+    from numpydoc.docscrape import NumpyDocString
+
+    return lambda text: NumpyDocString(text) is not None
+
+
+def napoleon_backend(style: str) -> Callable[[str], bool]:
+    from sphinxcontrib.napoleon import Config, GoogleDocstring, NumpyDocstring
+
+    config = Config(napoleon_use_param=True, napoleon_use_rtype=True)
+    docstring = {"google": GoogleDocstring, "numpy": NumpyDocstring}[style]
+    return lambda text: docstring(text, config=config) is not None
+
+
+def pdoc3_backend(style: str) -> Callable[[str], bool]:
+    from pdoc.html_helpers import to_markdown
+
+    return lambda text: to_markdown(text, docformat=style) is not None
+
+
+# backend name -> (supported styles, factory of a parse function returning False on a failed parse)
+BACKENDS = {
+    "lark_docstring_parser-earley": (("google",), lambda style: lark_backend()),
+    "lark_docstring_parser-lalr": (
+        ("google", "numpy"),
+        lambda style: lark_backend(parser="lalr", inline_transform=True, style=style),
+    ),
+    "fast_docstring_parser": (("google",), fast_backend),
+    "docstring_parser": (("google", "numpy"), docstring_parser_backend),
+    "numpydoc": (("numpy",), numpydoc_backend),
+    "sphinx_napoleon": (("google", "numpy"), napoleon_backend),
+    "pdoc3": (("google", "numpy"), pdoc3_backend),
+}
+
+
+def measure(parse: Callable[[str], bool], corpus: list[str]) -> dict:
+    """latency percentiles in microseconds, peak memory in bytes and errors of a single pass over the corpus"""
+    latencies, errors = [], 0
+    for text in corpus:
+        start = time.perf_counter_ns()
+        try:
+            ok = parse(text)
+        except Exception:  # third party parsers raise anything
+            ok = False
+        latencies.append((time.perf_counter_ns() - start) / 1000)
+        errors += not ok
+    tracemalloc.start()
+    for text in corpus:
+        try:
+            parse(text)
+        except Exception:
+            pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "docstrings": len(corpus),
+        "errors": errors,
+        "p50_us": round(percentiles[49], 1),
+        "p90_us": round(percentiles[89], 1),
+        "p99_us": round(percentiles[98], 1),
+        "peak_memory_bytes": peak,
+    }
+
+
+@pytest.mark.parametrize(("style", "size"), CORPORA)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backend(benchmark, backend, style, size):
+    styles, factory = BACKENDS[backend]
+    if style not in styles:
+        pytest.skip(f"{backend} does not support {style} style")
+    try:
+        parse = factory(style)
+    except ImportError as error:
+        pytest.skip(f"{backend} not available: {error}")
+    corpus = generate_corpus(style, size, count=CORPUS_SIZE, seed=SEED)
+
+    benchmark.group = f"{style}-{size}"
+    benchmark.extra_info.update(measure(parse, corpus))
+
+    def parse_all():
+        for text in corpus:
+            try:
+                parse(text)
+            except Exception:
+                pass
+
+    benchmark(parse_all)
+
+    if benchmark.stats:  # None with --benchmark-disable
+        benchmark.extra_info["docstrings_per_second"] = round(len(corpus) / benchmark.stats.stats.mean)
+    if backend in ("lark_docstring_parser-lalr", "fast_docstring_parser"):
+        assert benchmark.extra_info["errors"] == 0
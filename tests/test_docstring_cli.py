@@ -0,0 +1,115 @@
+import io
+import json
+import sys
+from itertools import count
+
+import pytest
+
+from src import docstring_cli
+from src.docstring_cli import iter_records, main
+from src.fast_docstring_parser import FastDocstringParser
+from test_docstring_scanner import package  # noqa: F401, fixture
+
+GOOGLE = "Summary line.\n\nArgs:\n    arg1: Description of arg1\n\n"
+BROKEN = "Summary line.\n\nArgs:\n    arg1 Description of arg1\n"
+
+
+def run(capsys, *argv) -> tuple[int, list[dict]]:
+    code = main(list(argv))
+    return code, [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+@pytest.mark.parametrize("jobs", ("1", "2"))
+def test_python_sources(capsys, package, jobs):
+    code, records = run(capsys, str(package), "--jobs", jobs)
+
+    assert code == 1
+    assert [(r["module"], r["qualname"], r["lineno"]) for r in records] == [
+        ("package.broken", None, 1),
+        ("package.sub", "init", 1),
+        ("package.sub.module", "function", 5),
+        ("package.sub.module", "function.<locals>.inner", 12),
+        ("package.sub.module", "Class.method", 19),
+        ("package.sub.module", "Class.conditional", 30),
+    ]
+    assert records[2]["docstring"]["args"] == [
+        ["arg1", None, "Description of arg1"],
+        ["arg2", "str", "Description of arg2"],
+    ]
+    assert records[0]["error"].startswith("SyntaxError")
+
+
+def test_python_sources_earley(capsys, package):
+    code, records = run(capsys, str(package), "--parser", "earley")
+
+    assert code == 1
+    assert [(r["qualname"], r["error"] is None) for r in records] == [
+        (None, False),
+        ("init", True),
+        ("function", True),
+        ("function.<locals>.inner", True),
+        ("Class.method", True),
+        ("Class.conditional", False),
+    ]
+    assert records[2] == run(capsys, str(package))[1][2]
+
+    code, issues = run(capsys, str(package), "--check", "--parser", "earley")
+    assert [(i["module"], i["qualname"], i["code"]) for i in issues] == [
+        ("package.broken", None, "parse-error"),
+        ("package.sub.module", "Class.conditional", "parse-error"),
+    ]
+
+
+@pytest.mark.parametrize("jobs", ("1", "2"))
+def test_jsonl(capsys, monkeypatch, tmp_path, jobs):
+    lines = [json.dumps(GOOGLE), "", json.dumps({"docstring": BROKEN}), "no json", json.dumps({"text": GOOGLE})]
+    monkeypatch.setattr(sys, "stdin", io.StringIO("\n".join(lines * 300) + "\n"))
+
+    code, records = run(capsys, "--jobs", jobs)
+
+    assert code == 1
+    assert len(records) == 4 * 300
+    assert [r["lineno"] for r in records[:4]] == [1, 3, 4, 5]
+    assert records[0]["docstring"]["args"] == [["arg1", None, "Description of arg1"]]
+    assert records[1]["docstring"] is None and records[1]["error"]
+    assert records[2]["error"].startswith("JSONDecodeError")
+    assert records[3]["error"].startswith("KeyError")
+    assert {r["module"] for r in records} == {"<stdin>"}
+
+    path = tmp_path / "docstrings.jsonl"
+    path.write_text(json.dumps(GOOGLE) + "\n")
+    assert run(capsys, str(path), "--parser", "earley") == (0, [dict(records[0], module=str(path))])
+
+
+def test_numpy_needs_lalr(capsys, package):
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(package), "--style", "numpy", "--parser", "earley"])
+
+    assert exit_info.value.code == 2
+    assert "--style numpy needs --parser lalr" in capsys.readouterr().err
+
+
+def test_errors_only(capsys, package):
+    code, records = run(capsys, str(package), "--errors-only")
+
+    assert code == 1
+    assert [(r["module"], r["qualname"]) for r in records] == [
+        ("package.broken", None),
+        ("package.sub.module", "Class.conditional"),
+    ]
+
+
+def test_streaming(monkeypatch):
+    """the first records are written before the whole input is read"""
+    consumed = count()
+
+    def stdin():
+        for _ in range(10 * docstring_cli.CHUNKSIZE):
+            next(consumed)
+            yield json.dumps(GOOGLE) + "\n"
+
+    monkeypatch.setattr(sys, "stdin", stdin())
+    records = next(iter_records(["-"], FastDocstringParser))
+
+    assert len(records) == docstring_cli.CHUNKSIZE
+    assert next(consumed) <= 2 * docstring_cli.CHUNKSIZE
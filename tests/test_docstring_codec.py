@@ -0,0 +1,92 @@
+import dataclasses
+import json
+import pickle
+
+import pytest
+
+from docstring_corpus import generate_corpus
+from src.docstring_codec import DocstringBatch, dumps, dumps_many, loads, loads_many
+from src.fast_docstring_parser import FastDocstringParser
+from src.lark_docstring_parser import Docstring, DocstringParser
+
+
+@pytest.fixture(scope="module")
+def docstrings() -> list[Docstring]:
+    parser = FastDocstringParser()
+    return [
+        parser.parse(text=text)[0] for size in ("small", "medium", "large") for text in generate_corpus("google", size)
+    ]
+
+
+def test_round_trip(docstrings):
+    numpy_parser = DocstringParser(parser="lalr", style="numpy")
+    docstrings = (
+        docstrings
+        + [numpy_parser.parse(text=text)[0] for text in generate_corpus("numpy", "medium")]
+        + [Docstring(), Docstring(summary="Ünïcödé ✓", args=[("a", None, "")], alias="Alias")]
+    )
+
+    for docstring in docstrings:
+        assert loads(dumps(docstring)) == docstring
+    assert loads(dumps(docstrings[-1])).alias == "alias"
+
+
+def test_batch(docstrings):
+    docstrings = docstrings[:10] + [None] + docstrings[10:20]
+
+    data = dumps_many(docstrings)
+    batch = loads_many(memoryview(data))
+
+    assert len(batch) == 21
+    assert list(batch) == docstrings
+    assert batch[10] is None
+    assert batch[-1] == docstrings[-1]
+    assert batch[3:6] == docstrings[3:6]
+    with pytest.raises(IndexError):
+        batch[21]
+    assert list(loads_many(dumps_many([]))) == []
+
+
+def test_wrong_format():
+    with pytest.raises(ValueError):
+        loads(b"DSC\x99" + b"\0" * 8)
+    with pytest.raises(ValueError):
+        DocstringBatch(dumps(Docstring()))
+
+
+# format -> (dumps, loads) of a list of docstrings
+FORMATS = {
+    "codec": (lambda docstrings: [dumps(d) for d in docstrings], lambda data: [loads(d) for d in data]),
+    "codec-batch": (dumps_many, lambda data: list(loads_many(data))),
+    "pickle": (
+        lambda docstrings: [pickle.dumps(d, protocol=pickle.HIGHEST_PROTOCOL) for d in docstrings],
+        lambda data: [pickle.loads(d) for d in data],
+    ),
+    "pickle-batch": (lambda docstrings: pickle.dumps(docstrings, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+    "json": (
+        lambda docstrings: [json.dumps(dataclasses.asdict(d)) for d in docstrings],
+        lambda data: [Docstring.from_dict(json.loads(d)) for d in data],
+    ),
+}
+
+
+def size(data) -> int:
+    return len(data) if isinstance(data, bytes) else sum(len(d) for d in data)
+
+
+@pytest.mark.repeat(1)
+@pytest.mark.parametrize("format_", FORMATS)
+def test_dumps(benchmark, docstrings, format_):
+    dumps_, _ = FORMATS[format_]
+    benchmark.group = "serialize-dumps"
+    data = benchmark(dumps_, docstrings)
+    benchmark.extra_info["bytes_per_docstring"] = round(size(data) / len(docstrings))
+
+
+@pytest.mark.repeat(1)
+@pytest.mark.parametrize("format_", FORMATS)
+def test_loads(benchmark, docstrings, format_):
+    dumps_, loads_ = FORMATS[format_]
+    benchmark.group = "serialize-loads"
+    data = dumps_(docstrings)
+    assert benchmark(loads_, data) == docstrings
@@ -0,0 +1,109 @@
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from docstring_corpus import NUMPY_SAMPLE, generate_corpus
+from src.docstring_daemon import MAX_FRAME, FRAME, DaemonClient, DocstringDaemon, recv_frame, send_frame
+from src.fast_docstring_parser import FastDocstringParser
+import test_fast_docstring_parser
+from test_lark_docstring_parser import assert_doctsring
+
+GOOGLE = test_fast_docstring_parser.test_fast_parse_google_style.__doc__
+NUMPY = NUMPY_SAMPLE
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    daemon = DocstringDaemon(str(tmp_path / "daemon.sock"))
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    yield daemon
+    daemon.shutdown()
+    daemon.server_close()
+    thread.join()
+
+
+def test_parse(daemon):
+    with DaemonClient(daemon.path) as client:
+        docstring, error = client.parse(GOOGLE)
+        assert error is None
+        assert_doctsring(docstring)
+
+        docstring, error = client.parse(NUMPY, style="numpy")
+        assert error is None
+        assert docstring.returns == ("bool", "Description of return value")
+
+        assert client.parse(NUMPY, style="auto") == (docstring, None)
+        docstring, error = client.parse("Summary line.\n\nArgs:\n    arg1 Description of arg1\n")
+        assert docstring is None and error
+        assert client.fallbacks == 0
+
+
+def test_concurrent_clients(daemon):
+    texts = generate_corpus("google", "medium", count=40)
+    parser = FastDocstringParser()
+    expected = [parser.parse(text=text) for text in texts]
+
+    def run(_):
+        with DaemonClient(daemon.path) as client:
+            return [client.parse_many(texts[i : i + 10]) for i in range(0, len(texts), 10)], client.fallbacks
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for batches, fallbacks in executor.map(run, range(8)):
+            assert [result for batch in batches for result in batch] == expected
+            assert fallbacks == 0
+    assert daemon.cache.hits >= 7 * len(texts)
+
+
+def test_fallback(tmp_path):
+    with DaemonClient(str(tmp_path / "missing.sock")) as client:
+        docstring, error = client.parse(GOOGLE)
+        assert error is None
+        assert_doctsring(docstring)
+        assert client.fallbacks == 1
+
+
+def test_stale_socket(tmp_path):
+    path = str(tmp_path / "daemon.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()  # leaves the socket file behind
+
+    with DocstringDaemon(path) as daemon:
+        assert daemon.path == path
+        with pytest.raises(OSError):
+            DocstringDaemon(path)
+
+
+def test_malformed_requests(daemon):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(daemon.path)
+        send_frame(sock, b"no json")
+        assert "malformed request" in json.loads(recv_frame(sock))["error"]
+        send_frame(sock, json.dumps({"style": "rest", "texts": ["Summary."]}).encode())
+        assert "malformed request" in json.loads(recv_frame(sock))["error"]
+        send_frame(sock, json.dumps({"texts": ["Summary.\n"]}).encode())  # the connection is still usable
+        assert json.loads(recv_frame(sock)) == {"errors": [None]}
+        recv_frame(sock)
+
+        sock.sendall(FRAME.pack(MAX_FRAME + 1))  # oversized frames close the connection
+        assert recv_frame(sock) is None
+
+
+@pytest.mark.repeat(1)
+@pytest.mark.parametrize("mode", ("daemon", "in-process"))
+def test_client_latency(benchmark, daemon, tmp_path, mode):
+    """a short lived client which parses a few docstrings, in process it builds the numpy grammar first"""
+    texts = generate_corpus("numpy", "medium", count=10)
+    path = daemon.path if mode == "daemon" else str(tmp_path / "missing.sock")
+
+    def run():
+        with DaemonClient(path) as client:
+            return client.parse_many(texts, style="numpy")
+
+    benchmark.group = "daemon-client"
+    results = benchmark(run)
+    assert all(error is None for _, error in results)
@@ -0,0 +1,73 @@
+import pytest
+
+from docstring_corpus import NUMPY_SAMPLE, generate_corpus
+from src.docstring_dispatch import NumpydocParser, StyleDispatcher, detect_style
+import test_fast_docstring_parser
+from test_lark_docstring_parser import assert_doctsring
+
+GOOGLE = test_fast_docstring_parser.test_fast_parse_google_style.__doc__
+NUMPY = NUMPY_SAMPLE
+
+
+@pytest.mark.parametrize(
+    ("text", "style"),
+    (
+        (GOOGLE, "google"),
+        (NUMPY, "numpy"),
+        ("Summary line.\n\nDescription.\n", "google"),
+        ("Summary line.\n\n    Parameters\n    ----------\n    a : int\n", "numpy"),
+        ("Summary line.\n\n----\n", "google"),  # a rule is no section header
+    ),
+)
+def test_detect_style(text, style):
+    assert detect_style(text) == style
+
+
+@pytest.mark.parametrize("style", ("google", "numpy"))
+def test_detect_style_corpus(style):
+    for size in ("small", "medium", "large"):
+        assert {detect_style(text) for text in generate_corpus(style, size)} == {style}
+
+
+def test_numpydoc_parser():
+    docstring, error = NumpydocParser().parse(text=NUMPY)
+
+    assert error is None
+    assert docstring.summary == "Summary line."
+    assert docstring.description == "Extended description of function."
+    assert docstring.args == [
+        ("arg1", "int, default: 5", "Description of arg1"),
+        ("arg2", "str", "Description of arg2"),
+        ("arg3", "str", "The [JMESpath](https://jmespath.org) query."),
+    ]
+    assert docstring.returns == ("bool", "Description of return value")
+    assert docstring.raises == [
+        ("AttributeError", "The ``Raises`` section is a list of all exceptions that are relevant to the interface."),
+        ("ValueError", "If `arg2` is equal to `arg1`."),
+    ]
+    assert docstring.examples.startswith("Examples should be written") and docstring.examples.endswith("True")
+
+
+def test_dispatch():
+    dispatcher = StyleDispatcher()
+
+    docstring, error = dispatcher.parse(text=GOOGLE)
+    assert error is None
+    assert_doctsring(docstring)
+
+    docstring, error = dispatcher.parse(text=NUMPY)
+    assert error is None
+    assert docstring.returns == ("bool", "Description of return value")
+
+    assert dispatcher.styles == {"google": 1, "numpy": 1}
+
+
+@pytest.mark.repeat(1)
+def test_dispatch_mixed_corpus(benchmark):
+    texts = [text for style in ("google", "numpy") for text in generate_corpus(style, "medium")]
+    dispatcher = StyleDispatcher()
+
+    results = benchmark(lambda: [dispatcher.parse(text=text) for text in texts])
+
+    assert all(error is None for _, error in results)
+    assert all(docstring.args for docstring, _ in results)
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from src.docstring_index import DocstringIndex, UpdateStats
+
+
+@pytest.fixture
+def package(tmp_path):
+    root = tmp_path / "package"
+    root.mkdir()
+    (root / "__init__.py").write_text("")
+    (root / "one.py").write_text(
+        'def one(arg1):\n    """Summary line.\n\n    Args:\n        arg1 (str): Description\n    """\n'
+    )
+    (root / "two.py").write_text('def two():\n    """Summary line."""\n')
+    (root / "three.py").write_text("")
+    return root
+
+
+def test_update(tmp_path, package):
+    with DocstringIndex(str(tmp_path / "index.db")) as index:
+        assert index.update(str(package)) == UpdateStats(parsed=4)
+        assert index.update(str(package)) == UpdateStats(unchanged=4)
+
+        (package / "two.py").write_text('def two():\n    """Changed summary line."""\n')
+        os.utime(package / "one.py", ns=(0, 0))  # touched only
+        (package / "three.py").unlink()
+        assert index.update(str(package)) == UpdateStats(parsed=1, touched=1, unchanged=1, deleted=1)
+
+        records = list(index.records())
+        assert [(r.module, r.qualname) for r in records] == [("package.one", "one"), ("package.two", "two")]
+        assert records[0].docstring.args == [("arg1", "str", "Description")]
+        assert records[1].docstring.summary == "Changed summary line."
+        assert [r.qualname for r in index.records(module="package.two")] == ["two"]
+
+
+def test_persisted(tmp_path, package):
+    with DocstringIndex(str(tmp_path / "index.db")) as index:
+        index.update(str(package))
+        records = list(index.records())
+
+    with DocstringIndex(str(tmp_path / "index.db")) as index:
+        assert list(index.records()) == records
+        assert index.update(str(package)) == UpdateStats(unchanged=4)
+
+
+def test_version_change(tmp_path, package, monkeypatch):
+    with DocstringIndex(str(tmp_path / "index.db")) as index:
+        index.update(str(package))
+
+    monkeypatch.setattr("src.docstring_index.SCHEMA_VERSION", -1)
+    with DocstringIndex(str(tmp_path / "index.db")) as index:
+        assert list(index.records()) == []
+        assert index.update(str(package)) == UpdateStats(parsed=4)
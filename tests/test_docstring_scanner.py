@@ -0,0 +1,88 @@
+import pytest
+
+from src.docstring_scanner import iter_source_files, scan_tree
+from src.lark_docstring_parser import DocstringParser
+
+MODULE = '''
+import does_not_exist
+
+
+def function(arg1, arg2):
+    """Summary line.
+
+    Args:
+        arg1: Description of arg1
+        arg2 (str): Description of arg2
+    """
+    def inner():
+        """Inner function."""
+
+
+class Class:
+    """Class docstrings are skipped."""
+
+    async def method(self):
+        """Summary line.
+
+        Returns:
+            bool: Description of return value
+        """
+
+    def undocumented(self):
+        pass
+
+    if True:
+        def conditional(self):
+            """Summary line with a quote ' character"""
+'''
+
+
+@pytest.fixture
+def package(tmp_path):
+    root = tmp_path / "package"
+    (root / "sub").mkdir(parents=True)
+    (root / "__init__.py").write_text("")
+    (root / "sub" / "__init__.py").write_text('def init():\n    """Package function."""\n')
+    (root / "sub" / "module.py").write_text(MODULE)
+    (root / "broken.py").write_text("def broken(:\n")
+    (root / "__pycache__").mkdir()
+    (root / "__pycache__" / "cached.py").write_text("")
+    return root
+
+
+def test_iter_source_files(package):
+    modules = [module for _, module in iter_source_files(str(package))]
+    assert modules == ["package", "package.broken", "package.sub", "package.sub.module"]
+
+
+@pytest.mark.parametrize(("workers",), ((1,), (2,)))
+def test_scan_tree(package, workers):
+    records = list(scan_tree(str(package), workers=workers))
+
+    assert [(r.module, r.qualname, r.lineno) for r in records] == [
+        ("package.broken", None, 1),
+        ("package.sub", "init", 1),
+        ("package.sub.module", "function", 5),
+        ("package.sub.module", "function.<locals>.inner", 12),
+        ("package.sub.module", "Class.method", 19),
+        ("package.sub.module", "Class.conditional", 30),
+    ]
+    assert records[0].error.startswith("SyntaxError")
+    assert records[2].docstring.args == [("arg1", None, "Description of arg1"), ("arg2", "str", "Description of arg2")]
+    assert records[4].docstring.returns == ("bool", "Description of return value")
+    assert records[5].docstring is None
+    assert records[5].error
+
+
+@pytest.mark.parametrize(("parser",), (("earley",), ("lalr",)))
+def test_scan_tree_lark(package, parser):
+    records = list(scan_tree(str(package), parser_factory=lambda: DocstringParser(parser=parser)))
+
+    assert [r.qualname for r in records if r.error is None] == [
+        "init",
+        "function",
+        "function.<locals>.inner",
+        "Class.method",
+    ]
+    assert records[2].docstring.args == [("arg1", None, "Description of arg1"), ("arg2", "str", "Description of arg2")]
+    assert records[4].docstring.returns == ("bool", "Description of return value")
@@ -0,0 +1,107 @@
+import pytest
+
+from src.fast_docstring_parser import FastDocstringParser, scan
+from src.lark_docstring_parser import DocstringParser
+from test_lark_docstring_parser import assert_doctsring
+
+
+@pytest.fixture(scope="module")
+def lalr_parser():
+    return DocstringParser(parser="lalr")
+
+
+@pytest.mark.repeat(1)
+def test_fast_parse_google_style(benchmark):
+    """Summary line.
+
+    Extended description of function.
+    2nd line.
+    3rd line.
+
+    Args:
+        arg1: Description of arg1
+        arg2 (str): Description of arg2
+        arg3: The [JMESpath](https://jmespath.org)
+            query.
+        *args: variable length argument list
+        **kwargs: arbitrary keyword arguments
+
+    Returns:
+        bool: Description of return value
+
+    Raises:
+        AttributeError: The ``Raises`` section is a list of all exceptions
+            that are relevant to the interface.
+        ValueError: If `arg2` is equal to `arg1`.
+
+    Alias:
+        What ever you want to call
+
+    Examples:
+        Examples should be written in doctest format, and should illustrate how
+        to use the function.
+
+        >>> a=1
+        >>> b=2
+        >>> func(a,b)
+        True
+
+    """
+    parser = FastDocstringParser()
+    # docstring, error = parser.parse(text=google_sample)
+    docstring, error = benchmark(parser.parse, text=test_fast_parse_google_style.__doc__)
+
+    assert error is None, error
+    assert docstring is not None
+
+    assert_doctsring(docstring)
+    assert parser.fallbacks == 0
+
+
+@pytest.mark.parametrize(
+    ("text",),
+    (
+        ("",),
+        ("Summary line.",),
+        ("Summary line.\nDescription.\n\nArgs:\n    arg1:\n        Description\n        of arg1\n",),
+        ("Args:\n\targ1 (int): Description\nYields:\n\tint: Value\n",),
+        ("Summary line.\n\nRaises:\n    ValueError: If\n        bad.\n    KeyError: Missing\n",),
+        ("Examples:\n\n    >>> a=1\n\n        True\n",),
+    ),
+)
+def test_scan_equals_lalr(lalr_parser, text):
+    docstring = scan(text)
+
+    assert docstring is not None
+    assert (docstring, None) == lalr_parser.parse(text=text)
+
+
+@pytest.mark.parametrize(
+    ("text",),
+    (
+        ("Summary line.\n\nArgs:\n\n    arg1: Description\n",),  # blank line after header
+        ("Summary line.\n\nReturns:\n    bool: Value\n    int: Value\n",),  # two return values
+        ("Raises:\n    ValueError: If bad.\n\nArgs:\n    arg1: Description\n",),  # section order
+        ("Summary line.\n  two space indentation\n",),
+        ("Summary line with a quote ' character\n",),
+    ),
+)
+def test_scan_rejects(lalr_parser, text):
+    assert scan(text) is None
+    assert lalr_parser.parse(text=text)[0] is None
+
+
+def test_fallback(lalr_parser):
+    parser = FastDocstringParser(fallback=lalr_parser)
+
+    docstring, error = parser.parse(text="Summary line.\n")
+    assert error is None, error
+    assert docstring.summary == "Summary line."
+
+    docstring, error = parser.parse(text="Summary line.\n\nArgs:\n    arg1 Description of arg1\n")
+    assert docstring is None
+    assert error
+
+    assert parser.parses == 2
+    assert parser.fallbacks == 1
+    assert parser.fallback_rate == 0.5
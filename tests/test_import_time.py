@@ -0,0 +1,56 @@
+"""Import time of the parser modules measured with 'python -X importtime' in fresh interpreters"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules usable without lark, e.g. by command line tools which never parse
+LIGHT_MODULES = ("src.lark_docstring_parser", "src.fast_docstring_parser", "src.lazy_docstring", "src.docstring_codec")
+
+
+def import_times(statement: str) -> dict[str, int]:
+    """cumulative import time in microseconds of each module imported by the statement"""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:") :].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", LIGHT_MODULES)
+def test_lark_is_imported_lazily(module):
+    times = import_times(f"import {module}")
+
+    assert module in times
+    assert "lark" not in times
+
+
+def test_lark_is_imported_on_first_use():
+    times = import_times("from src.lark_docstring_parser import DocstringParser")
+
+    assert "lark" in times
+    assert "src.lark_backend" in times
+
+
+@pytest.mark.repeat(1)
+def test_import_time(benchmark):
+    """import time of 'lark_docstring_parser' without and with lark, compare runs with '--benchmark-compare'"""
+    times = benchmark.pedantic(import_times, args=("import src.lark_docstring_parser",), rounds=5)
+    with_lark = import_times("from src.lark_docstring_parser import DocstringParser")
+
+    benchmark.extra_info["import_us"] = times["src.lark_docstring_parser"]
+    benchmark.extra_info["import_with_lark_us"] = with_lark["src.lark_docstring_parser"] + with_lark["src.lark_backend"]
+    assert times["src.lark_docstring_parser"] < with_lark["src.lark_docstring_parser"] + with_lark["src.lark_backend"]
@@ -0,0 +1,144 @@
+import inspect
+import random
+
+import pytest
+
+from docstring_corpus import generate_corpus
+from src.fast_docstring_parser import FastDocstringParser
+from src.incremental_docstring import Edit, reparse
+from src.lark_docstring_parser import DocstringParser
+import test_lazy_docstring
+
+PARSERS = {
+    "fast": FastDocstringParser,
+    "lalr": lambda: DocstringParser(parser="lalr"),
+    "earley": DocstringParser,
+}
+
+# inserted text of random edits, incl. new and broken section headers
+PIECES = (
+    "a",
+    " ",
+    "\n",
+    "\n\n",
+    "Args:\n",
+    "Returns:\n",
+    "Raises:\n",
+    "Examples:\n",
+    "    x: y\n",
+    "    int: z\n",
+    ":",
+    "",
+)
+
+
+class CountingParser:
+    """records the texts passed to the parser"""
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.texts = []
+
+    def parse(self, text: str):
+        self.texts.append(text)
+        return self.parser.parse(text=text)
+
+
+TEXT = inspect.cleandoc(test_lazy_docstring.test_lazy_alias.__doc__) + "\n\n"
+
+
+@pytest.mark.parametrize("backend", PARSERS)
+def test_reparse_equals_full_parse(backend):
+    parser = PARSERS[backend]()
+    rng = random.Random(7)
+    for text in generate_corpus("google", "medium", count=10):
+        docstring, _ = parser.parse(text=text)
+        for _ in range(30):
+            start = rng.randrange(len(text) + 1)
+            edit = Edit(start, min(len(text), start + rng.choice((0, 0, 1, 4))), rng.choice(PIECES))
+            result = reparse(text, docstring, edit, parser=parser)
+            text = edit.apply(text)
+            expected = parser.parse(text=text)
+            assert result[0] == expected[0] and (result[1] is None) == (expected[1] is None), (edit, text)
+            docstring = expected[0]
+
+
+def test_reparse_touched_section_only():
+    parser = CountingParser(FastDocstringParser())
+    docstring, _ = parser.parse(text=TEXT)
+    start = TEXT.index("True")
+    edit = Edit(start, start + len("True"), "False")
+
+    result, error = reparse(TEXT, docstring, edit, parser=parser)
+
+    assert error is None
+    assert parser.texts[1:] == ["Examples:\n    >>> func(a,b)\n    False\n\n"]
+    assert result == parser.parse(text=edit.apply(TEXT))[0]
+    assert result.args == docstring.args and result.args is not docstring.args
+
+
+def test_reparse_new_section():
+    parser = CountingParser(FastDocstringParser())
+    docstring, _ = parser.parse(text=TEXT)
+    start = TEXT.index("Alias:")
+    edit = Edit(start, start, "Raises:\n    ValueError: If the value is wrong\n\n")
+
+    result, error = reparse(TEXT, docstring, edit, parser=parser)
+
+    assert error is None
+    assert parser.texts[1:] == ["Raises:\n    ValueError: If the value is wrong\n\n"]
+    assert result.raises == [("ValueError", "If the value is wrong")]
+    assert result.alias == docstring.alias
+
+
+def test_reparse_error():
+    parser = FastDocstringParser()
+    docstring, _ = parser.parse(text=TEXT)
+    start = TEXT.index("arg1:")
+    edit = Edit(start, start + len("arg1:"), "arg1")
+
+    assert reparse(TEXT, docstring, edit, parser=parser) == parser.parse(text=edit.apply(TEXT))
+    # the next edit after an error parses the whole text
+    assert reparse(edit.apply(TEXT), None, Edit(start, start + 4, "arg1:"), parser=parser) == (docstring, None)
+
+
+@pytest.mark.parametrize(
+    ("old", "new"),
+    (
+        ("    KeyError: x", "KeyError: x"),  # read as description if parsed on its own
+        ("dict query", "dict xquery"),  # alias is normalized
+        ("x\n\nAlias:", "x\n\n\nAlias:"),  # double blank line, the full parse fails
+        ("    bool: y", "    bool: y  "),  # trailing spaces, the full parse fails
+    ),
+)
+def test_reparse_earley(old, new):
+    parser = DocstringParser()
+    text = (
+        "Summary line.\n\nArgs:\n    a: b\n\nReturns:\n    bool: y\n\nRaises:\n    KeyError: x\n\n"
+        "Alias:\n    dict query\n\n"
+    )
+    docstring, _ = parser.parse(text=text)
+    start = text.index(old)
+    edit = Edit(start, start + len(old), new)
+
+    assert reparse(text, docstring, edit, parser=parser) == parser.parse(text=edit.apply(text))
+
+
+@pytest.mark.repeat(1)
+@pytest.mark.parametrize("mode", ("full", "incremental"))
+def test_reparse_keystroke(benchmark, mode):
+    """a character typed into the examples of a docstring with 30 arguments, parsed by earley"""
+    parser = DocstringParser()
+    args = "".join(f"    arg{index} (str): Description of arg{index}\n" for index in range(30))
+    text = TEXT.replace("Args:\n", "Args:\n" + args)
+    docstring, error = parser.parse(text=text)
+    assert error is None
+    start = text.rindex("True")
+    edit = Edit(start, start + 1, "t")
+
+    benchmark.group = "reparse-keystroke"
+    if mode == "full":
+        result = benchmark(parser.parse, text=edit.apply(text))
+    else:
+        result = benchmark(reparse, text, docstring, edit, parser=parser)
+    assert result[1] is None
@@ -1,6 +1,18 @@
+import random
+import time
+import tracemalloc
+
 import pytest
 
-from src.lark_docstring_parser import DocstringParser, Docstring
+from src.lark_docstring_parser import (
+    CompactDocstring,
+    DocstringParser,
+    Docstring,
+    ParseCache,
+    ParseLimits,
+    ParseStats,
+    cache_file,
+)
 
 
 def assert_doctsring(docstring: Docstring):
@@ -150,3 +162,468 @@ def test_summary_newline(parser):
 
     assert error is None, error
     assert docstring is not None
+
+
+@pytest.fixture(scope="module")
+def lalr_parser():
+    return DocstringParser(parser="lalr")
+
+
+@pytest.mark.repeat(1)
+def test_parse_google_style_lalr(benchmark, lalr_parser):
+    """Summary line.
+
+    Extended description of function.
+    2nd line.
+    3rd line.
+
+    Args:
+        arg1: Description of arg1
+        arg2 (str): Description of arg2
+        arg3: The [JMESpath](https://jmespath.org)
+            query.
+        *args: variable length argument list
+        **kwargs: arbitrary keyword arguments
+
+    Returns:
+        bool: Description of return value
+
+    Raises:
+        AttributeError: The ``Raises`` section is a list of all exceptions
+            that are relevant to the interface.
+        ValueError: If `arg2` is equal to `arg1`.
+
+    Alias:
+        What ever you want to call
+
+    Examples:
+        Examples should be written in doctest format, and should illustrate how
+        to use the function.
+
+        >>> a=1
+        >>> b=2
+        >>> func(a,b)
+        True
+
+    """
+    # docstring, error = lalr_parser.parse(text=google_sample)
+    docstring, error = benchmark(lalr_parser.parse, text=test_parse_google_style_lalr.__doc__)
+
+    assert error is None, error
+    assert docstring is not None
+
+    assert_doctsring(docstring)
+
+
+@pytest.mark.repeat(1)
+def test_parse_google_style_lalr_inline_transform(benchmark):
+    """Summary line.
+
+    Extended description of function.
+    2nd line.
+    3rd line.
+
+    Args:
+        arg1: Description of arg1
+        arg2 (str): Description of arg2
+        arg3: The [JMESpath](https://jmespath.org)
+            query.
+        *args: variable length argument list
+        **kwargs: arbitrary keyword arguments
+
+    Returns:
+        bool: Description of return value
+
+    Raises:
+        AttributeError: The ``Raises`` section is a list of all exceptions
+            that are relevant to the interface.
+        ValueError: If `arg2` is equal to `arg1`.
+
+    Alias:
+        What ever you want to call
+
+    Examples:
+        Examples should be written in doctest format, and should illustrate how
+        to use the function.
+
+        >>> a=1
+        >>> b=2
+        >>> func(a,b)
+        True
+
+    """
+    parser = DocstringParser(parser="lalr", inline_transform=True)
+    # docstring, error = parser.parse(text=google_sample)
+    docstring, error = benchmark(parser.parse, text=test_parse_google_style_lalr_inline_transform.__doc__)
+
+    assert error is None, error
+    assert docstring is not None
+
+    assert_doctsring(docstring)
+
+
+def test_inline_transform_earley():
+    with pytest.raises(ValueError):
+        DocstringParser(inline_transform=True)
+
+
+def test_lalr_equals_earley(parser, lalr_parser):
+    text = test_parse_google_style_lalr.__doc__
+    assert lalr_parser.parse(text=text) == parser.parse(text=text)
+
+
+@pytest.mark.parametrize(
+    ("text",),
+    (
+        (r"""Summary line.""",),
+        (
+            r"""Summary line.
+""",
+        ),
+    ),
+)
+def test_summary_lalr(lalr_parser, text):
+    docstring, error = lalr_parser.parse(text=text)
+
+    assert error is None, error
+    assert docstring == Docstring(summary="Summary line.")
+
+
+def test_lalr_syntax_error(lalr_parser):
+    docstring, error = lalr_parser.parse(text="Summary line.\n\nArgs:\n    arg1 Description of arg1\n")
+
+    assert docstring is None
+    assert error
+
+
+@pytest.mark.repeat(1)
+def test_parse_google_style_lalr_cached(benchmark, tmp_path):
+    """Summary line.
+
+    Args:
+        arg2 (str): Description of arg2
+
+    Returns:
+        bool: Description of return value
+    """
+
+    def parse(text):
+        parser = DocstringParser(parser="lalr", cache=str(tmp_path))
+        return parser.parse(text=text)
+
+    # docstring, error = parse(text=google_sample)
+    docstring, error = benchmark(parse, text=test_parse_google_style_lalr_cached.__doc__)
+
+    assert error is None, error
+    assert docstring.args == [("arg2", "str", "Description of arg2")]
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_cache_file_depends_on_grammar(tmp_path):
+    assert cache_file(directory=str(tmp_path), grammar="a") != cache_file(directory=str(tmp_path), grammar="b")
+    assert cache_file(directory=str(tmp_path), grammar="a") == cache_file(directory=str(tmp_path), grammar="a")
+
+
+def test_cache_truncated(tmp_path, lalr_parser):
+    DocstringParser(parser="lalr", cache=str(tmp_path))
+    (cache,) = tmp_path.iterdir()
+    cache.write_bytes(cache.read_bytes()[:10])
+
+    parser = DocstringParser(parser="lalr", cache=str(tmp_path))
+
+    text = test_parse_google_style_lalr.__doc__
+    assert parser.parse(text=text) == lalr_parser.parse(text=text)
+    assert cache.stat().st_size > 10
+
+
+def test_cache_earley():
+    with pytest.raises(ValueError):
+        DocstringParser(cache=True)
+
+
+@pytest.mark.repeat(1)
+def test_parse_google_style_parse_cache(benchmark):
+    """Summary line.
+
+    Args:
+        arg2 (str): Description of arg2
+
+    Returns:
+        bool: Description of return value
+    """
+    parser = DocstringParser(parser="lalr", parse_cache=ParseCache())
+    # docstring, error = parser.parse(text=google_sample)
+    docstring, error = benchmark(parser.parse, text=test_parse_google_style_parse_cache.__doc__)
+
+    assert error is None, error
+    assert docstring.args == [("arg2", "str", "Description of arg2")]
+    assert parser.parse_cache.misses == 1
+
+
+def test_parse_cache_copies():
+    parser = DocstringParser(parser="lalr", parse_cache=ParseCache())
+    text = "Summary line.\n\nArgs:\n    arg1: Description of arg1\n"
+
+    docstring, _ = parser.parse(text=text)
+    docstring.args.append(("arg2", None, "Description of arg2"))
+    docstring.summary = None
+
+    assert parser.parse(text=text) == (
+        Docstring(summary="Summary line.", args=[("arg1", None, "Description of arg1")]),
+        None,
+    )
+    assert (parser.parse_cache.hits, parser.parse_cache.misses) == (1, 1)
+
+
+def test_parse_cache_errors():
+    parser = DocstringParser(parser="lalr", parse_cache=ParseCache())
+    text = "Summary line.\n\nArgs:\n    arg1 Description of arg1\n"
+
+    assert parser.parse(text=text) == parser.parse(text=text)
+    assert parser.parse(text=text)[0] is None
+    assert (parser.parse_cache.hits, parser.parse_cache.misses) == (2, 1)
+
+
+def test_parse_cache_earley():
+    parser = DocstringParser(parse_cache=ParseCache())
+
+    for text in ("Summary line.\n\n", "Summary line.", "Summary line.\n\n\n"):  # one normalized text
+        assert parser.parse(text=text) == (Docstring(summary="Summary line."), None)
+
+    assert (parser.parse_cache.hits, parser.parse_cache.misses) == (2, 1)
+
+
+def test_parse_cache_eviction():
+    cache = ParseCache(maxsize=2)
+    parser = DocstringParser(parser="lalr", parse_cache=cache)
+
+    for text in ("One.", "Two.", "One.", "Three.", "Two."):
+        parser.parse(text=text)
+
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 4)  # "Two." was evicted by "Three."
+
+
+def test_parse_cache_maxbytes():
+    cache = ParseCache(maxbytes=1000)
+    parser = DocstringParser(parser="lalr", parse_cache=cache)
+
+    for index in range(20):
+        parser.parse(text=f"Summary line {index}.")
+
+    assert 0 < len(cache) < 20
+    assert cache.bytes <= 1000
+
+
+@pytest.mark.parametrize(("workers", "chunksize"), ((1, 64), (2, 64), (2, 3)))
+def test_parse_many(lalr_parser, workers, chunksize):
+    texts = [f"Summary line {index}.\n\nArgs:\n    arg{index}: Description\n" for index in range(20)]
+    texts[7] = "Summary line.\n\nArgs:\n    arg1 Description of arg1\n"  # syntax error
+
+    results = lalr_parser.parse_many(texts, workers=workers, chunksize=chunksize)
+
+    assert results == [lalr_parser.parse(text=text) for text in texts]
+    assert results[7][0] is None
+    assert results[19][0].args == [("arg19", None, "Description")]
+
+
+def test_compact_docstring(lalr_parser):
+    docstring, _ = lalr_parser.parse(text=test_parse_google_style_lalr.__doc__)
+    compact = CompactDocstring.from_docstring(docstring)
+
+    assert_doctsring(compact.to_docstring())
+    assert list(compact.args) == docstring.args
+    assert compact.args[1].type == "str"
+    assert compact.raises[1].type == "ValueError"
+    assert compact.to_docstring() == docstring
+
+
+def test_compact_docstring_memory(lalr_parser):
+    texts = [test_parse_google_style_lalr.__doc__.replace("Summary", f"Summary {index}") for index in range(200)]
+
+    def allocated(convert) -> int:
+        tracemalloc.start()
+        docstrings = [convert(lalr_parser.parse(text=text)[0]) for text in texts]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len(docstrings) == len(texts)
+        return size
+
+    plain = allocated(lambda docstring: docstring)
+    compact = allocated(CompactDocstring.from_docstring)
+
+    assert compact < plain, f"{plain / len(texts):.0f} vs {compact / len(texts):.0f} bytes per docstring"
+
+
+def adversarial_docstring(rng: random.Random) -> str:
+    """long lines, long argument lists, deep indentation, blank lines and repeated headers"""
+    kind = rng.choice(("line", "args", "blank", "indent", "headers"))
+    count = rng.randint(100, 400)
+    if kind == "line":
+        return "Summary " + "word " * (10 * count) + "\n"
+    if kind == "args":
+        return "Summary.\n\nArgs:\n" + "    arg: a b c\n        continued\n" * count + "\n"
+    if kind == "blank":
+        return "Summary.\n" + "\n" * count + "Description.\n"
+    if kind == "indent":
+        return "Summary.\n\nExamples:\n" + "".join("    " * rng.randint(1, 8) + ">>> a\n" for _ in range(count))
+    return "Summary.\n\n" + "Args:\n    a: b\n\n" * count
+
+
+@pytest.mark.parametrize("text", ("a\n" * 10, "a" * 101))
+def test_input_limits(text):
+    limits = ParseLimits(max_length=100, max_lines=5)
+    for parser in (DocstringParser(limits=limits), DocstringParser(parser="lalr", limits=limits)):
+        docstring, error = parser.parse(text=text)
+        assert docstring is None
+        assert error.startswith("docstring exceeds limit of")
+
+
+@pytest.mark.parametrize("text", ("Summary", "Summary line.\n\nDescription.\n"))
+def test_input_limits_boundary(text):
+    """the limits apply to the text of the caller, not to the terminated text which is parsed"""
+    at_limit = ParseLimits(max_length=len(text), max_lines=text.count("\n"))
+    below_limit = ParseLimits(max_length=len(text) - 1)
+    for options in ({}, {"parser": "lalr"}):
+        expected = DocstringParser(**options).parse(text=text)
+        assert expected[1] is None, expected[1]
+        assert DocstringParser(limits=at_limit, **options).parse(text=text) == expected
+
+        error = DocstringParser(limits=below_limit, **options).parse(text=text)[1]
+        assert error == f"docstring exceeds limit of {len(text) - 1} characters"
+
+
+def test_step_limit(parser):
+    text = test_parse_google_style_lalr.__doc__
+    docstring, error = DocstringParser(limits=ParseLimits(max_steps=100)).parse(text=text)
+    assert docstring is None
+    assert error == "parse exceeds limit of 100 steps"
+
+    guarded = DocstringParser(limits=ParseLimits(max_steps=100_000, timeout=10))
+    assert guarded.parse(text=text) == parser.parse(text=text)
+
+
+def test_timeout_not_cached():
+    cache = ParseCache()
+    guarded = DocstringParser(parse_cache=cache, limits=ParseLimits(timeout=0.01))
+    docstring, error = guarded.parse(text="Summary " + "word " * 5000 + "\n")
+    assert docstring is None
+    assert error == "parse exceeds timeout of 0.01 seconds"
+    assert len(cache) == 0
+
+
+@pytest.mark.repeat(1)
+def test_adversarial_latency(lalr_parser):
+    """worst case latency of guarded parsers on seeded adversarial docstrings"""
+    rng = random.Random(13)
+    texts = [adversarial_docstring(rng) for _ in range(20)]
+    limits = ParseLimits(max_length=20_000, max_lines=2_000, max_steps=50_000, timeout=0.05)
+    for parser in (DocstringParser(limits=limits), DocstringParser(parser="lalr", limits=limits)):
+        for text in texts:
+            start = time.perf_counter()
+            parser.parse(text=text)
+            assert time.perf_counter() - start < 0.5, text[:40]
+
+
+@pytest.mark.parametrize(
+    "options", ({}, {"parser": "lalr"}, {"parser": "lalr", "inline_transform": True}), ids=("earley", "lalr", "inline")
+)
+def test_parse_stats(parser, options):
+    stats = ParseStats()
+    instrumented = DocstringParser(stats=stats, **options)
+    text = test_parse_google_style_lalr.__doc__
+
+    assert instrumented.parse(text=text) == parser.parse(text=text)
+    assert instrumented.parse(text="Summary line.\n\nArgs:\n    arg1 Description\n")[0] is None
+
+    assert (stats.parses, stats.errors, stats.error_rate) == (2, 1, 0.5)
+    assert stats.tokens > 100
+    assert stats.sections["args"] == 1 and stats.sections["yields"] == 0
+    assert all(stats.seconds[phase] > 0 for phase in ("lex", "parse", "post_process"))
+    assert (stats.seconds["transform"] > 0) == ("inline_transform" not in options)
+
+
+def test_parse_stats_hook(lalr_parser):
+    class Hook(ParseStats):
+        def __init__(self):
+            super().__init__()
+            self.calls = []
+
+        def record(self, seconds, tokens, docstring, error):
+            self.calls.append((set(seconds), docstring.summary))
+
+    hook = Hook()
+    DocstringParser(parser="lalr", stats=hook).parse(text="Summary line.\n")
+
+    assert hook.calls == [(set(ParseStats.PHASES), "Summary line.")]
+
+
+@pytest.mark.repeat(1)
+def test_parse_google_style_lalr_instrumented(benchmark):
+    parser = DocstringParser(parser="lalr", stats=ParseStats())
+    docstring, error = benchmark(parser.parse, text=test_parse_google_style_lalr.__doc__)
+    assert error is None
+    assert_doctsring(docstring)
+    benchmark.extra_info["stats"] = str(parser.stats)
+
+
+def test_parse_numpy_style_lalr():
+    """Summary line
+    continued.
+
+    Parameters
+    ----------
+    arg1
+        Description of arg1
+    arg2 : str, optional
+        Description
+            of arg2
+
+    *args
+        variable length argument list
+
+    Yields
+    ------
+    result : int
+        Description of yielded values
+
+    See Also
+    --------
+    other_function : ignored
+
+    Alias
+    -----
+    What ever you want to call
+    """
+    parser = DocstringParser(parser="lalr", style="numpy")
+    docstring, error = parser.parse(text=test_parse_numpy_style_lalr.__doc__)
+
+    assert error is None, error
+    assert docstring == Docstring(
+        summary="Summary line continued.",
+        args=[
+            ("arg1", None, "Description of arg1"),
+            ("arg2", "str, optional", "Description of arg2"),
+            ("*args", None, "variable length argument list"),
+        ],
+        yields=("int", "Description of yielded values"),
+        alias="whateveryouwanttocall",
+    )
+    inline_parser = DocstringParser(parser="lalr", style="numpy", inline_transform=True)
+    assert inline_parser.parse(text=test_parse_numpy_style_lalr.__doc__) == (docstring, None)
+
+
+def test_numpy_style_errors():
+    parser = DocstringParser(parser="lalr", style="numpy")
+    docstring, error = parser.parse(text="Summary.\n\nParameters\n----------\n    indented without item\n")
+    assert docstring is None and error
+
+    with pytest.raises(ValueError):
+        DocstringParser(style="numpy")
+    with pytest.raises(ValueError):
+        DocstringParser(parser="lalr", style="rest")
+
+
+def test_unsupported_parser():
+    with pytest.raises(ValueError):
+        DocstringParser(parser="cyk")
@@ -0,0 +1,106 @@
+import pytest
+
+from docstring_corpus import generate_corpus
+from src.lark_docstring_parser import Docstring, DocstringParser
+from src.lazy_docstring import parse_lazy, split_sections
+
+
+@pytest.fixture(scope="module")
+def lalr_parser():
+    return DocstringParser(parser="lalr")
+
+
+@pytest.mark.repeat(1)
+def test_lazy_alias(benchmark):
+    """Summary line.
+
+    Extended description of function.
+
+    Args:
+        arg1: Description of arg1
+        arg2 (str): Description of arg2
+
+    Returns:
+        bool: Description of return value
+
+    Alias:
+        What ever you want to call
+
+    Examples:
+        >>> func(a,b)
+        True
+
+    """
+
+    def alias(text):
+        return parse_lazy(text).alias
+
+    # alias = alias(text=google_sample)
+    assert benchmark(alias, text=test_lazy_alias.__doc__) == "whateveryouwanttocall"
+
+    docstring = parse_lazy(test_lazy_alias.__doc__)
+    assert docstring.alias == "whateveryouwanttocall"
+    assert docstring.parsed_sections == ["Alias:"]
+    assert docstring.yields is None
+    assert docstring.parsed_sections == ["Alias:"]
+
+
+@pytest.mark.parametrize("size", ("small", "medium", "large"))
+def test_lazy_equals_eager(lalr_parser, size):
+    for text in generate_corpus("google", size):
+        eager, error = lalr_parser.parse(text=text)
+        assert error is None, error
+
+        lazy = parse_lazy(text)
+        assert lazy == eager
+        assert lazy.to_docstring() == eager
+        assert not lazy.errors
+
+
+def test_lazy_equals_eager_earley():
+    parser = DocstringParser()
+    for text in generate_corpus("google", "small"):
+        eager, error = parser.parse(text=text)
+        assert error is None, error
+
+        lazy = parse_lazy(text, parser=parser)
+        assert lazy == eager
+        assert lazy.to_docstring() == eager
+        assert not lazy.errors
+
+
+@pytest.mark.parametrize(
+    "text",
+    (
+        "Summary line.\n\nExamples:\nnot indented\n\nArgs:\n    a: b\n\n",  # out of order, read as description
+        "Summary line.\n\nArgs:\n    a: b\n\nRaises:\nKeyError: x\n\n",  # read as description on its own
+        "Summary line.\n\nArgs:\n    a: b\n\n\nReturns:\n    bool: x\n\n",  # double blank line
+    ),
+)
+def test_lazy_whole_text_earley(text):
+    """texts whose sections parse differently on their own are parsed as a whole"""
+    parser = DocstringParser()
+    eager, error = parser.parse(text=text)
+
+    lazy = parse_lazy(text, parser=parser)
+    assert lazy.to_docstring() == (eager or Docstring())
+    assert lazy.errors == ({} if error is None else {"": error})
+    assert lazy.parsed_sections == [""]
+
+
+def test_lazy_section_error():
+    docstring = parse_lazy("Summary line.\n\nArgs:\n    arg1 Description\n\nReturns:\n    bool: Value\n")
+
+    assert docstring.returns == ("bool", "Value")
+    assert not docstring.errors
+    assert docstring.args is None
+    assert list(docstring.errors) == ["Args:"]
+
+
+def test_lazy_section_order():
+    assert split_sections("Summary.\n\nRaises:\n    ValueError: x\n\nArgs:\n    a: x\n") is None
+
+    docstring = parse_lazy("Summary.\n\nRaises:\n    ValueError: x\n\nArgs:\n    a: x\n")
+    assert docstring.summary is None
+    assert docstring.raises is None
+    assert docstring.errors
@@ -3,6 +3,9 @@ import pprint
 import pytest
 from numpydoc.docscrape import FunctionDoc, Parameter, NumpyDocString
 
+from src.docstring_dispatch import NumpydocParser
+from src.lark_docstring_parser import DocstringParser
+
 
 @pytest.fixture
 def pp():
@@ -143,3 +146,51 @@ def test_numpydoc_string(benchmark):
         "True",
     ]
     assert doc["Notes"] == ["blabla"]
+
+
+@pytest.fixture(scope="module")
+def numpy_parser():
+    return DocstringParser(parser="lalr", style="numpy", inline_transform=True)
+
+
+def test_lark_numpy_string(benchmark, numpy_parser):
+    """same sample as 'test_numpydoc_string' parsed by the lalr numpy grammar of 'DocstringParser'"""
+    docstring, error = benchmark(numpy_parser.parse, text=test_numpydoc_string.__doc__)
+
+    assert error is None, error
+    assert docstring.summary == "Summary line."
+    assert docstring.description == "Extended description of function."
+    assert docstring.args == [
+        ("arg1", "int, default: 5", "Description of arg1"),
+        ("arg2", "str", "Description of arg2"),
+        ("arg3", "str", "The [JMESpath](https://jmespath.org) query."),
+    ]
+    assert docstring.returns == ("bool", "Description of return value")
+    assert docstring.yields is None
+    assert docstring.raises == [
+        ("AttributeError", "The ``Raises`` section is a list of all exceptions that are relevant to the interface."),
+        ("ValueError", "If `arg2` is equal to `arg1`."),
+    ]
+    assert docstring.alias is None
+    assert docstring.examples == (
+        "Examples should be written in doctest format, and should illustrate how to use the function. "
+        ">>> a=1 >>> b=2 >>> func(a,b) True"
+    )
+
+
+def test_lark_numpy_paragraphs(numpy_parser):
+    text = "Summary line.\n\nParameters\n----------\nx : int\n    Para 1.\n\n    Para 2.\ny : str\n    Y.\n"
+    docstring, error = numpy_parser.parse(text=text)
+
+    assert error is None, error
+    assert docstring.args == [("x", "int", "Para 1. Para 2."), ("y", "str", "Y.")]
+
+
+def test_lark_numpy_multiple_returns(numpy_parser):
+    """'Docstring' holds a single return value, both numpy backends keep the first one"""
+    text = "Summary line.\n\nReturns\n-------\nx : int\n    Description of x\ny : str\n    Description of y\n"
+    docstring, error = numpy_parser.parse(text=text)
+
+    assert error is None, error
+    assert docstring.returns == ("int", "Description of x")
+    assert (docstring, error) == NumpydocParser().parse(text=text)
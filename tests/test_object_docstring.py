@@ -0,0 +1,114 @@
+import gc
+import types
+
+import pytest
+
+from src.lark_docstring_parser import DocstringParser
+from src.object_docstring import ObjectDocstrings, normalize_docstring, parse_object
+import test_lark_docstring_parser
+from test_lark_docstring_parser import assert_doctsring
+
+MODULE = '''
+"""Module summary."""
+from os import path
+
+
+def function(arg1):
+    """Summary line.
+
+    Args:
+        arg1: Description of arg1
+    """
+
+
+class Class:
+    """Class summary."""
+
+    @staticmethod
+    def static():
+        """Static summary."""
+
+    @property
+    def value(self):
+        """Property summary."""
+
+    def undocumented(self):
+        pass
+'''
+
+
+@pytest.fixture
+def module() -> types.ModuleType:
+    module = types.ModuleType("generated")
+    exec(MODULE, module.__dict__)
+    for obj in (module.function, module.Class):
+        obj.__module__ = "generated"
+    return module
+
+
+def test_parse_object():
+    docstring, error = parse_object(test_lark_docstring_parser.test_parse_google_style)
+
+    assert error is None
+    assert_doctsring(docstring)
+    assert (docstring, error) == DocstringParser().parse(
+        text=test_lark_docstring_parser.test_parse_google_style.__doc__
+    )
+
+
+def test_cache(module):
+    docstrings = ObjectDocstrings()
+
+    docstring, error = docstrings.parse(module.function)
+    docstring.args.append(("arg2", None, "Corrupted"))
+    assert docstrings.parse(module.function)[0].args == [("arg1", None, "Description of arg1")]
+    assert (docstrings.hits, docstrings.misses) == (1, 1)
+
+    module.function.__doc__ = "Changed summary."
+    assert docstrings.parse(module.function)[0].summary == "Changed summary."
+    assert docstrings.misses == 2
+
+    assert docstrings.parse(module.Class().static) == docstrings.parse(module.Class.static)
+    assert docstrings.parse(module.Class().undocumented) == (None, "Class.undocumented has no docstring")
+    assert docstrings.parse(len)[1] is None
+    assert len(docstrings) == 4
+    docstrings.parse(3)  # parsed but not cached
+    assert len(docstrings) == 4
+
+    del module.function
+    gc.collect()
+    assert len(docstrings) == 3
+
+
+def test_register(module):
+    docstrings = ObjectDocstrings()
+
+    assert docstrings.register_module(module) == 5
+    assert docstrings.misses == 5
+    assert docstrings.parse(module.Class.value.fget)[0].summary == "Property summary."
+    assert docstrings.parse(module)[0].summary == "Module summary."
+    assert docstrings.hits == 2
+
+    @docstrings.register
+    def decorated():
+        """Decorated summary."""
+
+    assert docstrings.misses == 6
+    assert docstrings.parse(decorated) == parse_object(decorated)
+
+
+def test_normalize_docstring():
+    assert normalize_docstring("Summary.\n\n    Args:\n        a: b\n    ") == "Summary.\n\nArgs:\n    a: b\n\n"
+
+
+@pytest.mark.repeat(1)
+@pytest.mark.parametrize("mode", ("parse", "parse_object"))
+def test_lookup(benchmark, mode):
+    function = test_lark_docstring_parser.test_parse_google_style
+    benchmark.group = "object-lookup"
+    if mode == "parse":
+        parser = DocstringParser()
+        docstring, error = benchmark(lambda: parser.parse(text=function.__doc__))
+    else:
+        docstring, error = benchmark(parse_object, function)
+    assert error is None
@@ -0,0 +1,201 @@
+import ast
+import json
+
+import pytest
+
+from src.docstring_cli import main
+from src.docstring_index import DocstringIndex
+from src.fast_docstring_parser import FastDocstringParser
+from src.signature_check import check_function, check_tree, signature
+
+MODULE = '''
+def consistent(arg1: str, *args, key: Optional[int] = None, **kwargs) -> bool:
+    """Summary line.
+
+    Args:
+        arg1 (str): Description of arg1
+        *args: Positional arguments
+        key (int): Description of key
+        **kwargs: Keyword arguments
+
+    Returns:
+        bool: Description of return value
+
+    Raises:
+        ValueError: If arg1 is empty
+    """
+    if not arg1:
+        raise ValueError(arg1)
+    return True
+
+
+def inconsistent(arg1: list[str], arg2, arg4) -> str:
+    """Summary line.
+
+    Args:
+        arg1 (str): Description of arg1
+        arg3: Description of arg3
+        arg4: Description of arg4
+
+    Returns:
+        int: Description of return value
+    """
+    if arg2:
+        raise KeyError(arg2)
+    if not arg4:
+        raise TypeError
+    return "".join(arg1)
+
+
+class Class:
+    def method(self, arg1):
+        """Summary line.
+
+        Args:
+            arg1: Description of arg1
+
+        Yields:
+            int: Description of yielded value
+        """
+        return arg1
+
+    @staticmethod
+    def static(arg1):
+        """Summary line.
+
+        Args:
+            arg1: Description of arg1
+        """
+        yield arg1
+
+    def stub(self):
+        """Summary line.
+
+        Returns:
+            int: Description of return value
+        """
+        raise NotImplementedError
+
+
+def summary_only(arg1):
+    """Summary line."""
+    return arg1
+
+
+def broken(arg1):
+    """Summary line.
+
+    Args:
+        arg1 Description of arg1
+    """
+'''
+
+
+@pytest.fixture
+def package(tmp_path):
+    root = tmp_path / "package"
+    root.mkdir()
+    (root / "__init__.py").write_text("")
+    (root / "module.py").write_text(MODULE)
+    (root / "syntax.py").write_text("def broken(:\n")
+    return root
+
+
+EXPECTED = [
+    ("package.module", "inconsistent", "arg-type"),
+    ("package.module", "inconsistent", "unknown-arg"),
+    ("package.module", "inconsistent", "missing-arg"),
+    ("package.module", "inconsistent", "returns-type"),
+    ("package.module", "inconsistent", "missing-raises"),
+    ("package.module", "inconsistent", "missing-raises"),
+    ("package.module", "Class.method", "extra-yields"),
+    ("package.module", "Class.static", "missing-yields"),
+    ("package.module", "broken", "parse-error"),
+    ("package.syntax", None, "parse-error"),
+]
+
+
+def test_signature():
+    function = ast.parse("def f(a, /, b: int, *c: str, d, e=1, **f: bool): pass").body[0]
+
+    assert [tuple(p) for p in signature(function)] == [
+        ("a", None),
+        ("b", "int"),
+        ("*c", "str"),
+        ("d", None),
+        ("e", None),
+        ("**f", "bool"),
+    ]
+    assert [p.name for p in signature(function, method=True)] == ["b", "*c", "d", "e", "**f"]
+
+
+def test_check_function():
+    function = ast.parse(MODULE).body[1]
+    docstring, _ = FastDocstringParser().parse(text=ast.get_docstring(function))
+
+    assert check_function(function, docstring) == [
+        ("arg-type", "type 'str' of 'arg1' does not match annotation 'list[str]'"),
+        ("unknown-arg", "argument 'arg3' is not a parameter"),
+        ("missing-arg", "parameter 'arg2' is not documented"),
+        ("returns-type", "type 'int' does not match annotation 'str'"),
+        ("missing-raises", "'KeyError' is raised but not documented"),
+        ("missing-raises", "'TypeError' is raised but not documented"),
+    ]
+
+
+@pytest.mark.parametrize("workers", (1, 2))
+def test_check_tree(package, workers):
+    issues = list(check_tree(str(package), workers=workers))
+
+    assert [(i.module, i.qualname, i.code) for i in issues] == EXPECTED
+    assert issues[-1].message.startswith("SyntaxError")
+
+
+class CountingParser(FastDocstringParser):
+    parsed = 0
+
+    def parse(self, text: str):
+        CountingParser.parsed += 1
+        return super().parse(text=text)
+
+
+def test_check_tree_index(tmp_path, package):
+    with DocstringIndex(str(tmp_path / "index.db"), parser_factory=CountingParser) as index:
+        assert [i.code for i in check_tree(str(package), parser_factory=CountingParser, index=index)] == [
+            code for *_, code in EXPECTED
+        ]
+        parsed = CountingParser.parsed
+        assert parsed == 7  # by the index only
+
+        assert len(list(check_tree(str(package), parser_factory=CountingParser, index=index))) == len(EXPECTED)
+        assert CountingParser.parsed == parsed
+
+
+def test_cli(capsys, tmp_path, package):
+    assert main(["--check", str(package), "--jobs", "2", "--index", str(tmp_path / "index.db")]) == 1
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(r["module"], r["qualname"], r["code"]) for r in records] == EXPECTED
+    assert records[0] == {
+        "module": "package.module",
+        "qualname": "inconsistent",
+        "lineno": 22,
+        "code": "arg-type",
+        "message": "type 'str' of 'arg1' does not match annotation 'list[str]'",
+    }
+
+
+def test_check_tree_index_same_module(tmp_path):
+    """files of different roots with the same module name are checked against their own docstrings"""
+    for root, name in (("a", "x"), ("b", "y")):
+        (tmp_path / root).mkdir()
+        (tmp_path / root / "util.py").write_text(
+            f'def f({name}):\n    """Summary.\n\n    Args:\n        {name}: Value\n    """\n'
+        )
+
+    with DocstringIndex(str(tmp_path / "index.db")) as index:
+        for root in ("b", "a"):
+            assert list(check_tree(str(tmp_path / root), index=index)) == []
+        assert [r.docstring.args for r in index.records(path=str(tmp_path / "a" / "util.py"))] == [
+            [("x", None, "Value")]
+        ]
@@ -0,0 +1,142 @@
+import random
+
+import pytest
+
+from docstring_corpus import generate_corpus
+from src.fast_docstring_parser import FastDocstringParser
+from src.lark_docstring_parser import Docstring, DocstringParser
+from src.tolerant_docstring import SectionError, parse_tolerant
+
+TEXT = """Summary line.
+
+Args:
+    arg1: Description of arg1
+
+Returns:
+    bool: Description of return value
+
+Raises:
+    ValueError Description of the error
+    KeyError: Description of the error
+
+Examples:
+    >>> func(a)
+
+"""
+
+
+def messy_corpus(texts: list[str]) -> list[str]:
+    """the docstrings with one malformed line each"""
+    rng = random.Random(3)
+    messy = []
+    for text in texts:
+        lines = text.split("\n")
+        index = rng.choice([i for i, line in enumerate(lines) if line.startswith("    ") and ": " in line])
+        lines[index] = lines[index].replace(": ", " ", 1)
+        messy.append("\n".join(lines))
+    return messy
+
+
+@pytest.mark.parametrize("parser", (FastDocstringParser(), DocstringParser(parser="lalr"), DocstringParser()))
+def test_partial_docstring(parser):
+    docstring, errors = parse_tolerant(TEXT, parser=parser)
+
+    assert docstring == Docstring(
+        summary="Summary line.",
+        args=[("arg1", None, "Description of arg1")],
+        returns=("bool", "Description of return value"),
+        examples=">>> func(a)",
+    )
+    assert [(e.header, e.line, e.column) for e in errors] == [("Raises:", 10, 15)]
+    assert "at line 10, column 15" in errors[0].message
+
+
+@pytest.mark.parametrize("parser", (FastDocstringParser(), DocstringParser(parser="lalr")))
+def test_equals_full_parse(parser):
+    for size in ("small", "medium", "large"):
+        for text in generate_corpus("google", size):
+            assert parse_tolerant(text, parser=parser) == (parser.parse(text=text)[0], [])
+
+
+def test_section_order():
+    text = "Summary line.\n\nRaises:\n    KeyError: x\n\nArgs:\n    arg1: y\n\nRaises:\n    ValueError: z\n"
+
+    docstring, errors = parse_tolerant(text)
+
+    assert docstring == Docstring(summary="Summary line.", raises=[("KeyError", "x")])
+    assert errors == [
+        SectionError("Args:", 6, None, "section 'Args:' is duplicate or out of order"),
+        SectionError("Raises:", 9, None, "section 'Raises:' is duplicate or out of order"),
+    ]
+
+
+def test_unseparated_sections():
+    text = "Summary line.\nArgs:\n    arg1: Description\n"
+
+    assert parse_tolerant(text, parser=DocstringParser(parser="lalr")) == (
+        Docstring(summary="Summary line.", args=[("arg1", None, "Description")]),
+        [],
+    )
+    # earley needs a blank line after each section, the sections parse on their own but the error is kept
+    docstring, errors = parse_tolerant(text, parser=DocstringParser())
+    assert docstring == Docstring(summary="Summary line.", args=[("arg1", None, "Description")])
+    assert [(e.header, e.line) for e in errors] == [("Args:", 3)]
+
+
+@pytest.mark.parametrize(
+    "text",
+    (
+        "Summary line.\n\nArgs:\n    arg1: Description\n\n\nReturns:\n    bool: Value\n\n",  # double blank line
+        "Summary line.\n\nArgs:\n    arg1: Description  \n\nReturns:\n    bool: Value\n\n",  # trailing spaces
+    ),
+)
+def test_unnormalized_sections(text):
+    """earley rejects the whole text, its error is reported although the sections parse on their own"""
+    parser = DocstringParser()
+    assert parser.parse(text=text)[1] is not None
+
+    docstring, errors = parse_tolerant(text, parser=parser)
+    assert docstring == Docstring(
+        summary="Summary line.", args=[("arg1", None, "Description")], returns=("bool", "Value")
+    )
+    assert [e.header for e in errors] == ["Args:"]
+
+
+def test_earley_sections():
+    text = "Summary line.\n\nArgs:\n    a: b\n\nRaises:\nKeyError: x\n\nAlias:\n    dict query\n\n"
+
+    docstring, errors = parse_tolerant(text, parser=DocstringParser())
+    # the alias is normalized like in a full parse, the 'Raises:' block on its own is read as description
+    assert docstring == Docstring(summary="Summary line.", args=[("a", None, "b")], alias="dictquery")
+    assert [(e.header, e.line) for e in errors] == [("Raises:", 6)]
+
+
+def test_single_section():
+    docstring, errors = parse_tolerant("Summary line with a quote ' character\n")
+
+    assert docstring == Docstring()
+    assert [(e.header, e.line) for e in errors] == [("", 1)]
+
+
+def test_messy_corpus():
+    parser = DocstringParser(parser="lalr")
+    for text in messy_corpus(generate_corpus("google", "medium")):
+        docstring, errors = parse_tolerant(text, parser=parser)
+        assert parser.parse(text=text)[0] is None
+        assert len(errors) == 1
+        assert docstring.summary is not None
+
+
+@pytest.mark.repeat(1)
+@pytest.mark.parametrize("mode", ("full-clean", "full-messy", "tolerant-messy"))
+def test_messy_corpus_speed(benchmark, mode):
+    """a full parse of a messy docstring stops at the first error, the clean corpus is the reference"""
+    parser = DocstringParser(parser="lalr")
+    texts = generate_corpus("google", "medium", count=100)
+    if mode != "full-clean":
+        texts = messy_corpus(texts)
+    benchmark.group = "tolerant-messy-corpus"
+    if mode.startswith("full"):
+        benchmark(lambda: [parser.parse(text=text) for text in texts])
+    else:
+        benchmark(lambda: [parse_tolerant(text, parser=parser) for text in texts])